@@ -0,0 +1,228 @@
+import asyncio
+import re
+import time
+from collections import Counter, deque
+from contextlib import asynccontextmanager
+from playwright.async_api import async_playwright
+from RunMetrics import metrics
+
+# Resource types aborted by default: we only need the DOM and __NEXT_DATA__
+DEFAULT_BLOCKED_RESOURCE_TYPES = ('image', 'media', 'font')
+
+# Third-party trackers and ad networks aborted by default, whatever their resource type
+DEFAULT_BLOCKED_URL_PATTERNS = (
+    r'google-analytics\.com', r'googletagmanager\.com', r'doubleclick\.net', r'googlesyndication\.com',
+    r'adservice\.google\.', r'connect\.facebook\.net', r'facebook\.com/tr', r'hotjar\.com',
+    r'clarity\.ms', r'sc-static\.net', r'snap\.licdn\.com', r'analytics\.tiktok\.com',
+)
+
+# Typical transfer size (bytes) per resource type, used to estimate the bytes saved by blocking
+ESTIMATED_BYTES = {'image': 60000, 'media': 500000, 'font': 40000, 'script': 50000, 'stylesheet': 20000}
+DEFAULT_ESTIMATED_BYTES = 10000
+
+
+# Shared Chromium pool that lives for a whole scraping run
+class BrowserPool:
+    def __init__(self, pool_size=4, pages_per_browser=100, headless=True, default_timeout=30000,
+                 block_resource_types=DEFAULT_BLOCKED_RESOURCE_TYPES, block_url_patterns=DEFAULT_BLOCKED_URL_PATTERNS):
+        self.pool_size = pool_size  # Max pages/contexts handed out at the same time
+        self.pages_per_browser = pages_per_browser  # Recycle a browser after it served this many pages
+        self.headless = headless  # Launch Chromium in headless mode
+        self.default_timeout = default_timeout  # Navigation and action timeout for every page
+        self.launch_count = 0  # How many times Chromium was launched during the run
+        self.recycle_count = 0  # How many browsers were retired after reaching pages_per_browser (or on request)
+        self.pages_served = 0  # Total pages handed out
+        self.block_resource_types = set(block_resource_types or ())  # Resource types aborted on every page
+        self.block_url_pattern = re.compile('|'.join(block_url_patterns)) if block_url_patterns else None
+        self.blocked_by_type = Counter()  # Aborted requests per resource type
+        self.bytes_saved_estimate = 0  # Estimated bytes not downloaded thanks to blocking
+        self.bytes_loaded = 0  # Bytes of the responses that were let through (from Content-Length)
+        self.page_reports = deque(maxlen=1000)  # Recent per-page reports: url, time to DOM, blocked, bytes saved
+        self._dom_times = []  # Seconds from goto() to DOMContentLoaded, per navigation
+        self._context_reports = {}  # Open context -> blocked requests / bytes saved so far
+        self._playwright = None
+        self._browser = None  # Browser currently handing out new pages
+        self._browser_pages = 0  # Pages handed out by the current browser
+        self._open_pages = {}  # Open page count per browser, used to close retired browsers
+        self._retired = set()  # Browsers that stopped taking pages but still have pages open
+        self._semaphore = asyncio.Semaphore(pool_size)
+        self._lock = asyncio.Lock()
+
+    async def __aenter__(self):
+        await self.start()
+        return self
+
+    async def __aexit__(self, exc_type, exc, tb):
+        await self.close()
+
+    async def start(self):
+        """Start the Playwright driver (Chromium is launched lazily)."""
+        if self._playwright is None:
+            self._playwright = await async_playwright().start()
+
+    async def close(self):
+        """Close every browser and stop the Playwright driver."""
+        browsers = list(self._open_pages)
+        self._open_pages.clear()
+        self._retired.clear()
+        self._browser = None
+        for browser in browsers:
+            await self._close_browser(browser)
+        if self._playwright is not None:
+            await self._playwright.stop()
+            self._playwright = None
+
+    def stats(self):
+        """Return launch and usage counters for the run."""
+        return {
+            'launch_count': self.launch_count,
+            'recycle_count': self.recycle_count,
+            'pages_served': self.pages_served,
+            'open_browsers': len(self._open_pages),
+            'open_contexts': self.open_contexts,
+            'blocked_requests': sum(self.blocked_by_type.values()),
+            'blocked_by_type': dict(self.blocked_by_type),
+            'bytes_saved_estimate': self.bytes_saved_estimate,
+            'bytes_loaded': self.bytes_loaded,
+            'navigations': len(self._dom_times),
+            'avg_time_to_dom': round(sum(self._dom_times) / len(self._dom_times), 3) if self._dom_times else None,
+            'p95_time_to_dom': round(sorted(self._dom_times)[int(0.95 * (len(self._dom_times) - 1))], 3) if self._dom_times else None,
+        }
+
+    @property
+    def open_contexts(self):
+        """Contexts handed out and not closed yet."""
+        return len(self._context_reports)
+
+    async def recycle(self):
+        """Retire the current browser now: new pages get a fresh Chromium, open ones finish first."""
+        async with self._lock:
+            if self._browser is None or self._browser_pages == 0:
+                return False  # Nothing served yet, a relaunch would not free anything
+            await self._retire_current()
+            return True
+
+    @asynccontextmanager
+    async def context(self):
+        """Hand out a fresh browser context from the pool."""
+        async with self._semaphore:
+            browser = await self._acquire_browser()
+            context = None
+            try:
+                with metrics.timer("new_context"):
+                    context = await browser.new_context()
+                context.set_default_navigation_timeout(self.default_timeout)
+                context.set_default_timeout(self.default_timeout)
+                report = self._context_reports[context] = {'blocked': 0, 'bytes_saved': 0}
+                if self.block_resource_types or self.block_url_pattern:
+                    await context.route("**/*", self._make_route_handler(report))
+                context.on("response", self._count_response_bytes)
+                yield context
+            finally:
+                if context is not None:
+                    self._context_reports.pop(context, None)
+                    try:
+                        await context.close()
+                    except Exception as e:
+                        print(f"Error closing browser context: {e}")
+                await self._release_browser(browser)
+
+    @asynccontextmanager
+    async def page(self):
+        """Hand out a fresh page (in its own context) from the pool."""
+        async with self.context() as context:
+            page = await context.new_page()
+            yield page
+
+    async def goto(self, page, url, **kwargs):
+        """Navigate page to url, recording time to DOM and what blocking saved for it."""
+        started = time.monotonic()
+        response = await page.goto(url, **kwargs)
+        time_to_dom = time.monotonic() - started
+        self._dom_times.append(time_to_dom)
+        metrics.record("goto", time_to_dom)
+        report = self._context_reports.get(page.context, {})
+        self.page_reports.append({
+            'url': url,
+            'time_to_dom': round(time_to_dom, 3),
+            'blocked': report.get('blocked', 0),
+            'bytes_saved': report.get('bytes_saved', 0),
+        })
+        return response
+
+    def _make_route_handler(self, report):
+        async def handle_route(route):
+            request = route.request
+            resource_type = request.resource_type
+            if resource_type in self.block_resource_types or (
+                self.block_url_pattern is not None and self.block_url_pattern.search(request.url)
+            ):
+                saved = ESTIMATED_BYTES.get(resource_type, DEFAULT_ESTIMATED_BYTES)
+                self.blocked_by_type[resource_type] += 1
+                self.bytes_saved_estimate += saved
+                report['blocked'] += 1
+                report['bytes_saved'] += saved
+                await route.abort()
+            else:
+                await route.continue_()
+        return handle_route
+
+    def _count_response_bytes(self, response):
+        try:
+            nbytes = int(response.headers.get('content-length', 0))
+            self.bytes_loaded += nbytes
+            metrics.add_bytes("goto", nbytes)
+        except ValueError:
+            pass
+
+    async def _acquire_browser(self):
+        async with self._lock:
+            if self._playwright is None:
+                await self.start()
+
+            # Retire the current browser once it served its share of pages or crashed
+            if self._browser is not None:
+                if not self._browser.is_connected():
+                    self._open_pages.pop(self._browser, None)
+                    self._browser = None
+                elif self._browser_pages >= self.pages_per_browser:
+                    await self._retire_current()
+
+            if self._browser is None:
+                with metrics.timer("browser_launch"):
+                    self._browser = await self._playwright.chromium.launch(headless=self.headless)
+                self._browser_pages = 0
+                self._open_pages[self._browser] = 0
+                self.launch_count += 1
+
+            self._browser_pages += 1
+            self._open_pages[self._browser] += 1
+            self.pages_served += 1
+            return self._browser
+
+    async def _retire_current(self):
+        retired = self._browser
+        self._retired.add(retired)
+        self.recycle_count += 1
+        self._browser = None
+        if self._open_pages.get(retired, 0) == 0:
+            await self._discard_browser(retired)
+
+    async def _release_browser(self, browser):
+        async with self._lock:
+            if browser not in self._open_pages:
+                return
+            self._open_pages[browser] -= 1
+            if browser in self._retired and self._open_pages[browser] == 0:
+                await self._discard_browser(browser)
+
+    async def _discard_browser(self, browser):
+        self._retired.discard(browser)
+        self._open_pages.pop(browser, None)
+        await self._close_browser(browser)
+
+    async def _close_browser(self, browser):
+        try:
+            await browser.close()
+        except Exception as e:
+            print(f"Error closing browser: {e}")
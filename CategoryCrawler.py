@@ -0,0 +1,730 @@
+import asyncio
+import argparse
+import os
+import json
+import logging
+import zlib
+from collections import Counter
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime, timedelta
+from typing import Dict, List, Optional, Tuple
+from pathlib import Path
+from multiprocessing import get_context
+from openpyxl import load_workbook
+from BrowserPool import BrowserPool, DEFAULT_BLOCKED_RESOURCE_TYPES, DEFAULT_BLOCKED_URL_PATTERNS
+from DetailsScraper import DetailsScraping
+from DriveUploadService import DriveUploadService
+from ExtractionEngine import ExtractionEngine
+from FetchLimiter import FetchLimiter
+from HttpCache import HttpCache
+from HttpFetcher import HttpFetcher
+from MemoryGovernor import MemoryGovernor
+from RecordNormalizer import normalize_records
+from RequestCoalescer import RequestCoalescer
+from ResultsStore import ResultsStore, category_file_name
+from NextDataFetcher import NextDataFetcher
+from RunJournal import RunJournal
+from RunMetrics import metrics, timed
+from SeenAdsIndex import SeenAdsIndex
+from StreamingSink import StreamingExcelWriter
+from SavingOnDrive import SavingOnDrive
+
+DEFAULT_SECTIONS_FILE = "sections.json"
+
+
+# One site section (gifts, fashion-and-family, ...): its categories and where its files go on Drive
+class Section:
+    def __init__(self, name: str, credentials_env: str, parent_folder_id: str, categories: Dict[str, List[Tuple[str, int]]]):
+        self.name = name  # Short name, also the local output folder
+        self.credentials_env = credentials_env  # Env var holding the service account JSON
+        self.parent_folder_id = parent_folder_id  # Drive folder that receives the dated subfolders
+        self.categories = {category: [tuple(url) for url in urls] for category, urls in categories.items()}  # Category -> (URL template, page count)
+        self.drive_saver = None  # SavingOnDrive, set up by the crawler
+        self.upload_service = None  # DriveUploadService, set up by the crawler
+
+    @classmethod
+    def from_dict(cls, config: Dict) -> "Section":
+        """Build a section from one entry of the sections file."""
+        return cls(config["name"], config["credentials_env"], config["parent_folder_id"], config["categories"])
+
+    def to_dict(self) -> Dict:
+        """The section's sections-file entry, e.g. to hand it to a shard worker process."""
+        return {
+            "name": self.name,
+            "credentials_env": self.credentials_env,
+            "parent_folder_id": self.parent_folder_id,
+            "categories": {category: [list(url) for url in urls] for category, urls in self.categories.items()},
+        }
+
+
+def load_sections(path: str = DEFAULT_SECTIONS_FILE, names: Optional[List[str]] = None) -> List[Section]:
+    """Read the sections file, keeping only the named sections when names is given."""
+    with open(path, encoding="utf-8") as f:
+        config = json.load(f)
+    sections = [Section.from_dict(entry) for entry in config["sections"]]
+    if names:
+        unknown = set(names) - {section.name for section in sections}
+        if unknown:
+            raise ValueError(f"Unknown sections in {path}: {sorted(unknown)}")
+        sections = [section for section in sections if section.name in names]
+    return sections
+
+
+def shard_for(section_name: str, category: str, shard_count: int) -> int:
+    """Shard that owns a category: stable across runs, processes and machines (unlike hash())."""
+    return zlib.crc32(f"{section_name}/{category}".encode("utf-8")) % shard_count
+
+
+def crawl_shard(section_configs: List[Dict], shard_index: int, shard_count: int, workers: int, target_date: str, temp_dir: str) -> Dict:
+    """Entry point of a local shard worker process: crawl the shard's categories into temp_dir without uploading."""
+    logging.basicConfig(
+        level=logging.INFO,
+        format=f"%(asctime)s - shard {shard_index}/{shard_count} - %(levelname)s - %(message)s",
+        handlers=[logging.StreamHandler(), logging.FileHandler("scraper.log")],
+    )
+    crawler = CategoryCrawler([Section.from_dict(config) for config in section_configs])
+    crawler.set_shard(shard_index, shard_count)
+    crawler.temp_dir = Path(temp_dir)
+    # The machine's browser memory and the run's request budget are shared by the local workers
+    crawler.browser_rss_limit_mb //= workers
+    crawler.max_host_rate /= workers
+    return asyncio.run(crawler.crawl_offline(target_date))
+
+
+# Progress of one category while its page and ad work items are in the queue
+class CategoryState:
+    def __init__(self, section: Section, name: str, urls: List[Tuple[str, int]], sink: StreamingExcelWriter, target_date: str):
+        self.section = section
+        self.name = name
+        self.urls = urls  # (URL template, configured page count) pairs, crawled one after the other
+        self.sink = sink  # Streaming Excel sink receiving the category's rows
+        self.target_date = target_date  # Only ads published on this day are kept
+        self.url_index = 0  # URL template currently being paginated
+        self.next_page = 1  # Next page number to enqueue
+        self.last_page = 1  # Last page queued so far; page 1 sets it, pages with in-window ads extend it
+        self.discovered = None  # Page count read from the listing metadata, caps the extension
+        self.undated_listing = False  # Set once a listing page's cards came without listing-level dates
+        self.stopped = False  # Set when a page holds only ads older than target_date
+        self.pages_in_flight = 0  # Listing pages queued or being scraped
+        self.pending = 0  # Work items (pages and ads) not finished yet
+
+    @property
+    def url_template(self) -> str:
+        return self.urls[self.url_index][0]
+
+    def extend_pages(self, url_template: str, number: int, max_pages: int) -> bool:
+        """Add one page when `number` is the last page of the current template, up to the discovered page count."""
+        limit = min(self.discovered or max_pages, max_pages)
+        if self.stopped or url_template != self.url_template or number != self.last_page or number >= limit:
+            return False
+        self.last_page += 1
+        return True
+
+    def start_next_url(self) -> bool:
+        """Move on to the next URL template; False when every template was crawled."""
+        if self.url_index + 1 >= len(self.urls):
+            return False
+        self.url_index += 1
+        self.next_page = 1
+        self.last_page = 1
+        self.discovered = None
+        self.undated_listing = False
+        self.stopped = False
+        return True
+
+
+# Crawls every category of every section in one event loop, sharing one browser pool, fetch budget and Drive client
+class CategoryCrawler:
+    def __init__(self, sections: List[Section]):
+        self.sections = sections  # Sections crawled by this run
+        self.crawl_workers = 8  # Workers pulling page and ad items from the shared queue
+        self.max_concurrent_pages = 2  # Listing pages of one category queued or scraped at the same time
+        self.logger = logging.getLogger(__name__)
+        self.setup_logging()  # Initialize logging
+        self.temp_dir = Path("temp_files")  # Local Excel files, one subfolder per section
+        self.temp_dir.mkdir(exist_ok=True)
+        self.upload_retries = 3  # Max attempts to retry uploads
+        self.upload_retry_delay = 2  # Base delay (seconds) for the exponential upload backoff
+        self.upload_max_retry_delay = 60  # Upper bound (seconds) for one upload backoff delay
+        self.upload_workers = 3  # Files uploaded to Drive in parallel, per section
+        self.browser_pool_size = 4  # Max browser pages open at the same time across the run
+        self.pages_per_browser = 100  # Recycle Chromium after this many pages to bound memory
+        self.browser_pool = None  # Shared BrowserPool, created in the run method
+        self.block_resource_types = DEFAULT_BLOCKED_RESOURCE_TYPES  # Resource types aborted on pooled pages
+        self.block_url_patterns = DEFAULT_BLOCKED_URL_PATTERNS  # Tracker/ad URL patterns aborted on pooled pages
+        self.max_concurrent_ads = 4  # Max detail/listing fetches in flight across all sections
+        self.per_host_interval = 0.25  # Starting gap between request starts on q84sale.com; the limiter adapts it
+        self.max_host_rate = 10.0  # Ceiling (requests/second) the limiter may ramp a host up to
+        self.fetch_limiter = None  # Shared FetchLimiter, created in the run method
+        self.extraction_mode = "next_data"  # Read details from __NEXT_DATA__, selectors only as fallback
+        self.field_sources = Counter()  # Which extraction path served each detail field
+        self.extraction_engine = ExtractionEngine()  # One evaluate() per listing/detail page, shared to count round-trips
+        self.fetch_mode = os.environ.get("SCRAPER_FETCH_MODE", "json")  # "json" (data route), "http" (HTML) or "browser"; each falls back to the next
+        self.http_fetcher = None  # Shared HttpFetcher, created in the run method
+        self.next_data_fetcher = None  # Shared NextDataFetcher (buildId discovered once per run), created in the run method
+        self.http_cache_path = "http_cache.sqlite3"  # Listing pages kept between runs for conditional requests
+        self.http_cache_max_mb = 64  # Least recently used listing pages are evicted above this size
+        self.http_cache = None  # HttpCache, opened in the run method
+        self.coalescer_max_entries = 2000  # Finished detail results kept in memory to serve repeated ads
+        self.request_coalescer = None  # Shared RequestCoalescer, created in the run method
+        self.max_pages = 30  # Safety cap on pages crawled per category
+        self.excel_batch_size = 200  # Rows buffered before they are streamed into the Excel file
+        self.add_typed_columns = True  # Normalize each batch into typed price/views/ads/membership/date columns
+        self.seen_index_path = "seen_ads.sqlite3"  # Index of ads collected by earlier runs
+        self.seen_index_ttl_days = 14  # Forget ads not seen for this many days
+        self.seen_index = None  # SeenAdsIndex, opened in the run method
+        self.results_store_path = "results.sqlite3"  # Every collected ad across runs, indexed for queries and Excel exports
+        self.results_store = None  # ResultsStore, opened in the run method
+        self.journal_dir = Path("run_journal")  # Checkpoints of the current day's run, kept between attempts
+        self.journal = None  # RunJournal, opened in the run method
+        self.browser_rss_limit_mb = 2500  # Recycle Chromium when the browsers' RSS exceeds this (7GB runners)
+        self.python_rss_limit_mb = 1500  # Force a GC and log heap growth when this process exceeds this
+        self.trace_heap = os.environ.get("SCRAPER_TRACE_HEAP") == "1"  # tracemalloc leak reports, off by default (slower)
+        self.memory_governor = None  # MemoryGovernor, started in the run method
+        self.report_json_path = "run_report.json"  # Per-stage timings and run counters, uploaded with the logs
+        self.report_html_path = "run_report.html"  # Same report as an HTML table
+        self.shard_index = 0  # Shard crawled by this process (0-based)
+        self.shard_count = 1  # Shards the categories are split over, by runner jobs or local worker processes
+        self.queue = None  # Work items: (priority, sequence, kind, category state, payload)
+        self._sequence = 0  # Tie-breaker keeping the queue FIFO within a priority
+
+    def setup_logging(self):
+        """Initialize logging configuration."""
+        stream_handler = logging.StreamHandler()  # Log to console
+        file_handler = logging.FileHandler("scraper.log")  # Log to file
+
+        logging.basicConfig(
+            level=logging.INFO,
+            format="%(asctime)s - %(levelname)s - %(message)s",
+            handlers=[stream_handler, file_handler],
+        )
+        self.logger.setLevel(logging.INFO)
+        # httpx/httpcore log one INFO line per request, which would flood scraper.log with data route fetches
+        logging.getLogger("httpx").setLevel(logging.WARNING)
+        logging.getLogger("httpcore").setLevel(logging.WARNING)
+        print("Logging setup complete.")
+
+    def set_shard(self, shard_index: int, shard_count: int):
+        """Only crawl the categories of one shard out of shard_count."""
+        if shard_count < 1 or not 0 <= shard_index < shard_count:
+            raise ValueError(f"Invalid shard {shard_index} of {shard_count}")
+        self.shard_index = shard_index
+        self.shard_count = shard_count
+
+    def owns(self, section: Section, category: str) -> bool:
+        """True when the category belongs to this process's shard."""
+        return self.shard_count == 1 or shard_for(section.name, category, self.shard_count) == self.shard_index
+
+    def shard_path(self, path) -> Path:
+        """Per-shard variant of a state/report file, so shards never write the same file."""
+        path = Path(path)
+        if self.shard_count == 1:
+            return path
+        return path.with_name(f"{path.stem}.shard{self.shard_index}of{self.shard_count}{path.suffix}")
+
+    def new_scraper(self, url: str, target_date: str) -> DetailsScraping:
+        """Create a scraper for one listing page wired to the run's shared resources."""
+        return DetailsScraping(
+            url,
+            browser_pool=self.browser_pool,
+            fetch_limiter=self.fetch_limiter,
+            extraction_mode=self.extraction_mode,
+            field_sources=self.field_sources,
+            fetch_mode=self.fetch_mode,
+            http_fetcher=self.http_fetcher,
+            target_date=target_date,
+            seen_index=self.seen_index,
+            extraction_engine=self.extraction_engine,
+            next_data_fetcher=self.next_data_fetcher,
+            request_coalescer=self.request_coalescer,
+        )
+
+    def enqueue(self, state: CategoryState, kind: str, payload: Tuple):
+        """Queue a work item; ad items go before pages so finished listing pages drain first."""
+        self._sequence += 1
+        state.pending += 1
+        self.queue.put_nowait((0 if kind == "ad" else 1, self._sequence, kind, state, payload))
+
+    def schedule_pages(self, state: CategoryState):
+        """Queue the category's next listing pages, up to max_concurrent_pages in flight."""
+        while True:
+            while not state.stopped and state.pages_in_flight < self.max_concurrent_pages and state.next_page <= state.last_page:
+                self.enqueue(state, "page", (state.url_template, state.next_page))
+                state.pages_in_flight += 1
+                state.next_page += 1
+            exhausted = state.pages_in_flight == 0 and (state.stopped or state.next_page > state.last_page)
+            if not (exhausted and state.start_next_url()):
+                return
+
+    @timed("crawl_page")
+    async def crawl_page(self, state: CategoryState, url_template: str, number: int):
+        """Scrape one listing page, queue its ads, then queue the pages that follow it."""
+        url = url_template.format(number)
+        scraper = self.new_scraper(url, state.target_date)
+        checkpoint = self.journal.page(state.section.name, state.name, url)
+        if checkpoint is not None:
+            # Scraped by an earlier attempt of this run: replay it instead of fetching it again
+            basic_cards = checkpoint['cards']
+            scraper.page_count = checkpoint['page_count']
+            scraper.reached_older_ads = checkpoint['reached_older_ads']
+            scraper.dated_in_window = sum(1 for card in basic_cards if scraper.listing_day(card) == state.target_date)
+            state.pages_in_flight -= 1
+        else:
+            try:
+                basic_cards = await scraper.get_basic_cards()
+            except Exception as e:
+                self.logger.error(f"Error scraping {url}: {e}")
+                basic_cards = []
+            finally:
+                state.pages_in_flight -= 1
+            if basic_cards or scraper.reached_older_ads:
+                self.journal.record_page(state.section.name, state.name, url, basic_cards, scraper.page_count, scraper.reached_older_ads)
+
+        if scraper.listing_unchanged:
+            self.logger.info(f"{url} is unchanged since it was cached, reusing its parsed cards")
+        if scraper.skipped_cards:
+            self.logger.info(f"Skipped {scraper.skipped_cards} cards outside {state.target_date} on {url}")
+        finished_ads = self.journal.ads(state.section.name, state.name)
+        finished_in_window = False  # Ads of this page finished by an earlier attempt count like fetched ones
+        for basic_card in basic_cards:
+            if basic_card.get('link') not in finished_ads:
+                self.enqueue(state, "ad", (scraper, basic_card, url_template, number))
+            elif self.is_in_window(finished_ads[basic_card['link']], state.target_date):
+                finished_in_window = True
+
+        if basic_cards and not state.undated_listing and not any(basic_card.get('listing_date') for basic_card in basic_cards):
+            state.undated_listing = True
+            self.logger.warning(f"No listing-level dates on {url}: {state.section.name}/{state.name} only paginates "
+                                f"as far as its detail pages show ads from {state.target_date}")
+
+        if number == 1:
+            # Page 1 carries the pagination metadata; the discovered count caps the extension below
+            state.discovered = scraper.page_count
+            page_count = state.urls[state.url_index][1]
+            state.last_page = min(page_count, state.discovered or page_count, self.max_pages)
+            self.logger.info(f"{state.section.name}/{state.name}: crawling {state.last_page} pages, more while they have ads "
+                             f"from {state.target_date} (discovered: {state.discovered})")
+
+        if scraper.reached_older_ads:
+            self.logger.info(f"Every ad on {url} predates {state.target_date}, stopping pagination")
+            state.stopped = True
+        elif scraper.dated_in_window or finished_in_window:
+            # Extend the configured count while pages still have ads from target_date; undated cards
+            # only extend it once their details show they are in the window (crawl_ad)
+            state.extend_pages(url_template, number, self.max_pages)
+        self.schedule_pages(state)
+
+    @timed("crawl_ad")
+    async def crawl_ad(self, state: CategoryState, scraper: DetailsScraping, basic_card: Dict, url_template: str, number: int):
+        """Fetch one ad's details and stream it into the category's sink if it is from target_date."""
+        card = await scraper.fetch_card(basic_card)
+        if card.get('id'):
+            # Failed detail fetches (no id) stay out of the journal, so a resumed attempt retries them
+            self.journal.record_ad(state.section.name, state.name, basic_card.get('link'), card)
+        if self.is_in_window(card, state.target_date):
+            state.sink.append([card])
+            if state.extend_pages(url_template, number, self.max_pages):
+                self.schedule_pages(state)
+        await self.memory_governor.after_ad()
+
+    @staticmethod
+    def is_in_window(card: Dict, target_date: str) -> bool:
+        """True when the ad was published on target_date."""
+        return bool(card.get("date_published")) and card.get("date_published", "").split()[0] == target_date
+
+    async def crawl_worker(self):
+        """Pull page and ad items until the run is cancelled."""
+        while True:
+            _, _, kind, state, payload = await self.queue.get()
+            try:
+                if kind == "page":
+                    await self.crawl_page(state, *payload)
+                else:
+                    await self.crawl_ad(state, *payload)
+            except Exception as e:
+                self.logger.error(f"Error processing {kind} item of {state.section.name}/{state.name}: {e}")
+            finally:
+                state.pending -= 1
+                if state.pending == 0:
+                    await self.finish_category(state)
+                self.queue.task_done()
+
+    async def finish_category(self, state: CategoryState):
+        """Close a finished category's Excel file and hand it to the upload stage right away."""
+        try:
+            excel_file = await self.save_to_excel(state.name, state.sink)
+            if excel_file and state.section.upload_service is not None:
+                state.section.upload_service.submit(self.upload_category(state, excel_file))
+            else:  # Nothing to upload, or an offline run (benchmarks) that keeps the file locally
+                self.journal.record_done(state.section.name, state.name)
+        except Exception as e:
+            self.logger.error(f"Error processing {state.section.name}/{state.name}: {e}")
+
+    @timed("upload_category")
+    async def upload_category(self, state: CategoryState, excel_file: str):
+        """Upload a finished category's file and checkpoint the category once it is on Drive."""
+        uploaded_files = await self.upload_and_clean_up(state.section, [excel_file])
+        if uploaded_files:
+            self.journal.record_done(state.section.name, state.name)
+
+    def open_excel_sink(self, section: Section, category: str) -> StreamingExcelWriter:
+        """Open a streaming Excel sink for a category; rows are written in bounded batches."""
+        section_dir = self.temp_dir / section.name
+        section_dir.mkdir(parents=True, exist_ok=True)
+        return StreamingExcelWriter(
+            section_dir / self.excel_file_name(category),
+            batch_size=self.excel_batch_size,
+            transform=normalize_records if self.add_typed_columns else None,
+            # Each written batch is also upserted into the results store (not opened by the merging parent of run_sharded)
+            on_flush=(lambda rows: self.results_store.upsert(section.name, category, rows)) if self.results_store is not None else None,
+        )
+
+    @staticmethod
+    def excel_file_name(category: str) -> str:
+        """File name of a category's Excel output."""
+        return category_file_name(category)
+
+    @timed("save_to_excel")
+    async def save_to_excel(self, category: str, sink: StreamingExcelWriter) -> str:
+        """Finish a category's Excel file."""
+        if not sink.row_count:
+            self.logger.info(f"No data to save for {category}, skipping Excel file creation.")
+            sink.discard()
+            return None
+
+        try:
+            excel_file = sink.close()
+            self.logger.info(f"Successfully saved {sink.row_count} rows for {category}")
+            return str(excel_file)
+        except Exception as e:
+            self.logger.error(f"Error saving Excel file {sink.path}: {e}")
+            return None
+
+    async def upload_files_with_retry(self, section: Section, files: List[str]) -> List[str]:
+        """Upload files to the section's Drive folder in parallel, retrying each with exponential backoff."""
+        uploaded_files = []
+        yesterday = (datetime.now() - timedelta(days=1)).strftime("%Y-%m-%d")
+
+        try:
+            self.logger.info(f"Checking local files before upload: {files}")
+            for file in files:
+                self.logger.info(f"File {file} exists: {os.path.exists(file)}, size: {os.path.getsize(file) if os.path.exists(file) else 'N/A'}")
+
+            folder_id = await section.upload_service.get_or_create_folder(yesterday)
+            if not folder_id:
+                raise Exception("Failed to create or get folder ID")
+
+            existing_files = []
+            for file in files:
+                if os.path.exists(file):
+                    existing_files.append(file)
+                else:
+                    self.logger.error(f"File not found for upload: {file}")
+
+            file_ids = await section.upload_service.upload_files(existing_files, folder_id)
+            for file, file_id in zip(existing_files, file_ids):
+                if file_id:
+                    uploaded_files.append(file)
+                    self.logger.info(f"Successfully uploaded {file} with ID: {file_id}")
+
+        except Exception as e:
+            self.logger.error(f"Error in upload process: {e}")
+            raise
+
+        return uploaded_files
+
+    async def upload_and_clean_up(self, section: Section, files: List[str]):
+        """Upload a category's files, then remove the local copies (runs in the background)."""
+        try:
+            return await self.upload_files_with_retry(section, files)
+        finally:
+            for file in files:
+                try:
+                    os.remove(file)
+                    self.logger.info(f"Cleaned up local file: {file}")
+                except Exception as e:
+                    self.logger.error(f"Error cleaning up {file}: {e}")
+
+    def setup_drive(self, section: Section) -> bool:
+        """Authenticate the section's Drive saver and check its parent folder; False skips the section."""
+        try:
+            credentials_json = os.environ.get(section.credentials_env)
+            if not credentials_json:
+                raise EnvironmentError(f"{section.credentials_env} environment variable not found")
+            else:
+                self.logger.info(f"Environment variable {section.credentials_env} is set.")
+
+            credentials_dict = json.loads(credentials_json)
+            section.drive_saver = SavingOnDrive(credentials_dict, section.parent_folder_id)
+            section.drive_saver.authenticate()
+            self.logger.info(f"Testing Drive API access for {section.name}...")
+            try:
+                section.drive_saver.client.get_file(section.parent_folder_id)
+                self.logger.info("Successfully accessed parent folder")
+            except Exception as e:
+                self.logger.error(f"Failed to access parent folder: {e}")
+                return False
+        except Exception as e:
+            self.logger.error(f"Failed to setup Google Drive for {section.name}: {e}")
+            return False
+
+        section.upload_service = DriveUploadService(
+            section.drive_saver,
+            max_workers=self.upload_workers,
+            retries=self.upload_retries,
+            base_delay=self.upload_retry_delay,
+            max_delay=self.upload_max_retry_delay,
+            logger=self.logger,
+        )
+        return True
+
+    async def open_resources(self, target_date: str):
+        """Create the browser pool, memory governor, fetch limiter, HTTP client and cache, request coalescer, seen-ads index, results store and run journal shared by the run."""
+        self.browser_pool = BrowserPool(
+            pool_size=self.browser_pool_size,
+            pages_per_browser=self.pages_per_browser,
+            block_resource_types=self.block_resource_types,
+            block_url_patterns=self.block_url_patterns,
+        )
+        await self.browser_pool.start()
+        self.memory_governor = MemoryGovernor(
+            browser_pool=self.browser_pool,
+            logger=self.logger,
+            browser_rss_limit_mb=self.browser_rss_limit_mb,
+            python_rss_limit_mb=self.python_rss_limit_mb,
+            trace_heap=self.trace_heap,
+        )
+        self.memory_governor.start()
+        self.fetch_limiter = FetchLimiter(
+            max_concurrent=self.max_concurrent_ads, per_host_interval=self.per_host_interval, max_rate=self.max_host_rate
+        )
+        self.http_cache = HttpCache(str(self.shard_path(self.http_cache_path)), max_bytes=self.http_cache_max_mb * 1024 * 1024)
+        self.http_cache.open()
+        self.http_fetcher = HttpFetcher(max_connections=self.max_concurrent_ads, cache=self.http_cache)
+        await self.http_fetcher.start()
+        self.next_data_fetcher = NextDataFetcher(self.http_fetcher, self.fetch_limiter)
+        self.request_coalescer = RequestCoalescer(max_entries=self.coalescer_max_entries)
+        self.logger.info(f"Fetch mode: {self.fetch_mode}")
+        # Categories stick to their shard, so each shard keeps its own seen index and journal
+        self.seen_index = SeenAdsIndex(str(self.shard_path(self.seen_index_path)), ttl_days=self.seen_index_ttl_days)
+        self.seen_index.open()
+        self.logger.info(f"Seen-ads index loaded: {self.seen_index.stats()}")
+        self.results_store = ResultsStore(str(self.shard_path(self.results_store_path)))
+        self.results_store.open()
+        self.journal = RunJournal(self.shard_path(self.journal_dir / f"{target_date}.jsonl"))
+        self.journal.open()
+        self.logger.info(f"Run journal loaded: {self.journal.stats()}")
+
+    async def close_resources(self):
+        """Close everything opened by open_resources."""
+        self.journal.close()
+        self.results_store.close()
+        self.seen_index.close()
+        await self.http_fetcher.close()
+        self.http_cache.close()
+        await self.browser_pool.close()
+        self.memory_governor.stop()
+
+    async def crawl(self, sections: List[Section], target_date: str):
+        """Run every category of the sections through one work queue until all items are done."""
+        # One queue and worker pool for the whole run: a slow category never holds up the others
+        self.queue = asyncio.PriorityQueue()
+        for section in sections:
+            for category, urls in section.categories.items():
+                if not self.owns(section, category):
+                    continue
+                if self.journal.is_done(section.name, category):
+                    self.logger.info(f"{section.name}/{category} was finished by an earlier attempt, skipping")
+                    continue
+                self.logger.info(f"Starting to scrape {section.name}/{category}")
+                sink = self.open_excel_sink(section, category)
+                # Rows finished before an interruption are rebuilt from the journal
+                sink.append([card for card in self.journal.ads(section.name, category).values() if self.is_in_window(card, target_date)])
+                state = CategoryState(section, category, urls, sink, target_date)
+                self.schedule_pages(state)
+        workers = [asyncio.create_task(self.crawl_worker()) for _ in range(self.crawl_workers)]
+
+        try:
+            await self.queue.join()
+        finally:
+            for worker in workers:
+                worker.cancel()
+            await asyncio.gather(*workers, return_exceptions=True)
+
+    async def run(self):
+        """Crawl every category of every section through one work queue and handle uploads."""
+        self.temp_dir.mkdir(exist_ok=True)
+
+        sections = [section for section in self.sections if self.setup_drive(section)]
+        if not sections:
+            self.logger.error("No section could be set up, nothing to crawl")
+            return
+
+        yesterday = (datetime.now() - timedelta(days=1)).strftime("%Y-%m-%d")  # Only include listings from yesterday
+        await self.open_resources(yesterday)
+        try:
+            await self.crawl(sections, yesterday)
+        finally:
+            for section in sections:
+                await section.upload_service.wait()
+                section.upload_service.close()
+                self.logger.info(f"Drive client stats ({section.name}): {section.drive_saver.client.stats()}")
+            await self.close_resources()
+            self.logger.info(f"HTTP fetcher stats: {self.http_fetcher.stats()}")
+            self.logger.info(f"HTTP cache stats: {self.http_cache.stats()}")
+            self.logger.info(f"Next.js data route stats: {self.next_data_fetcher.stats()}")
+            self.logger.info(f"Request coalescer stats: {self.request_coalescer.stats()}")
+            self.logger.info(f"Seen-ads index stats: {self.seen_index.stats()}")
+            self.logger.info(f"Results store stats: {self.results_store.stats()}")
+            self.logger.info(f"Run journal stats: {self.journal.stats()}")
+            self.logger.info(f"Browser pool stats: {self.browser_pool.stats()}")
+            self.logger.info(f"Fetch limiter stats: {self.fetch_limiter.stats()}")
+            self.logger.info(f"Memory stats: {self.memory_governor.stats()}")
+            self.logger.info(f"Detail field sources: {dict(sorted(self.field_sources.items()))}")
+            self.logger.info(f"In-page extraction calls: {self.extraction_engine.evaluate_calls}")
+            self.write_report(sections)
+
+    async def crawl_offline(self, target_date: str) -> Dict:
+        """Crawl every section without Drive: finished category files stay in temp_dir (shard workers)."""
+        await self.open_resources(target_date)
+        try:
+            await self.crawl(self.sections, target_date)
+        finally:
+            await self.close_resources()
+            self.write_report(self.sections)
+        return self.journal.stats()
+
+    async def run_sharded(self, workers: int):
+        """Crawl this runner's shard with local worker processes, then merge their files per category and upload them."""
+        self.temp_dir.mkdir(exist_ok=True)
+
+        sections = [section for section in self.sections if self.setup_drive(section)]
+        if not sections:
+            self.logger.error("No section could be set up, nothing to crawl")
+            return
+
+        yesterday = (datetime.now() - timedelta(days=1)).strftime("%Y-%m-%d")  # Only include listings from yesterday
+        shards_dir = self.temp_dir / "shards"
+        configs = [section.to_dict() for section in sections]
+        # Each local worker takes one sub-shard of this runner's shard
+        shard_count = self.shard_count * workers
+        loop = asyncio.get_running_loop()
+        with ProcessPoolExecutor(max_workers=workers, mp_context=get_context("spawn")) as pool:
+            results = await asyncio.gather(*(
+                loop.run_in_executor(pool, crawl_shard, configs, shard_index, shard_count, workers, yesterday, str(shards_dir / str(shard_index)))
+                for shard_index in range(self.shard_index * workers, (self.shard_index + 1) * workers)
+            ), return_exceptions=True)
+        for shard_index, result in zip(range(self.shard_index * workers, (self.shard_index + 1) * workers), results):
+            if isinstance(result, BaseException):
+                self.logger.error(f"Shard {shard_index}/{shard_count} failed, its finished categories are still merged: {result}")
+            else:
+                self.logger.info(f"Shard {shard_index}/{shard_count} finished, run journal: {result}")
+
+        try:
+            for section in sections:
+                for category in section.categories:
+                    # Also picks up files left by an earlier attempt whose upload did not go through
+                    shard_files = sorted(
+                        shards_dir.glob(f"*/{section.name}/{self.excel_file_name(category)}"),
+                        key=lambda file: int(file.parent.parent.name),
+                    )
+                    if shard_files:
+                        excel_file = await self.merge_shard_files(section, category, shard_files)
+                        section.upload_service.submit(self.upload_merged(section, excel_file, shard_files))
+        finally:
+            for section in sections:
+                await section.upload_service.wait()
+                section.upload_service.close()
+                self.logger.info(f"Drive client stats ({section.name}): {section.drive_saver.client.stats()}")
+
+    @timed("merge_shard_files")
+    async def merge_shard_files(self, section: Section, category: str, shard_files: List[Path]) -> Optional[str]:
+        """Merge a category's shard files into the file save_to_excel writes, in a deterministic row order."""
+        columns, rows = await asyncio.to_thread(self.read_excel_rows, shard_files)
+        # Duplicates (an ad seen by two shards after the shard count changed) keep the lowest shard's row
+        unique_rows = {}
+        for row in rows:
+            unique_rows.setdefault(row.get('link') or len(unique_rows), row)
+        # Newest ads first, like the listing pages; ties broken by id and link so reruns produce identical files
+        ordered = sorted(
+            unique_rows.values(),
+            key=lambda row: tuple(str(row.get(column) or '') for column in ('date_published', 'id', 'link')),
+            reverse=True,
+        )
+        sink = self.open_excel_sink(section, category)
+        sink.columns = columns
+        sink.append(ordered)
+        self.logger.info(f"Merged {len(ordered)} rows of {section.name}/{category} from {len(shard_files)} shard file(s)")
+        return await self.save_to_excel(category, sink)
+
+    @staticmethod
+    def read_excel_rows(files: List[Path]) -> Tuple[Optional[List[str]], List[Dict]]:
+        """Read the header and the row dicts of Excel files written by StreamingExcelWriter."""
+        columns, rows = None, []
+        for file in files:
+            workbook = load_workbook(file, read_only=True)
+            try:
+                values = workbook.active.iter_rows(values_only=True)
+                header = next(values, None)
+                if header:
+                    columns = columns or list(header)
+                    rows.extend(dict(zip(header, row)) for row in values)
+            finally:
+                workbook.close()
+        return columns, rows
+
+    async def upload_merged(self, section: Section, excel_file: Optional[str], shard_files: List[Path]):
+        """Upload a merged category file; shard files are only removed once their rows are on Drive."""
+        if excel_file:
+            uploaded_files = await self.upload_and_clean_up(section, [excel_file])
+            if not uploaded_files:
+                return
+        for file in shard_files:
+            os.remove(file)
+
+    def write_report(self, sections: List[Section]):
+        """Write the JSON/HTML run report: per-stage p50/p95/p99, counts and bytes plus every component's stats."""
+        try:
+            json_path, html_path = self.shard_path(self.report_json_path), self.shard_path(self.report_html_path)
+            report = metrics.write_report(json_path, html_path, extra={
+                'sections': [section.name for section in sections],
+                'shard': f"{self.shard_index}/{self.shard_count}",
+                'browser_pool': self.browser_pool.stats(),
+                'fetch_limiter': self.fetch_limiter.stats(),
+                'memory': self.memory_governor.stats(),
+                'http_fetcher': self.http_fetcher.stats(),
+                'http_cache': self.http_cache.stats(),
+                'next_data_fetcher': self.next_data_fetcher.stats(),
+                'request_coalescer': self.request_coalescer.stats(),
+                'seen_index': self.seen_index.stats(),
+                'results_store': self.results_store.stats(),
+                'run_journal': self.journal.stats(),
+                'drive_clients': {section.name: section.drive_saver.client.stats() for section in sections if section.drive_saver},
+                'evaluate_calls': self.extraction_engine.evaluate_calls,
+                'field_sources': dict(sorted(self.field_sources.items())),
+            })
+            for stage, values in report['stages'].items():
+                self.logger.info(f"Stage {stage}: {values}")
+            self.logger.info(f"Run report written to {json_path} and {html_path}")
+        except Exception as e:
+            self.logger.error(f"Error writing run report: {e}")
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Crawl q84sale sections and upload yesterday's ads to Google Drive.")
+    parser.add_argument("--config", default=DEFAULT_SECTIONS_FILE, help="Sections file (default: %(default)s)")
+    parser.add_argument("--section", action="append", dest="sections", help="Only crawl this section (repeatable)")
+    parser.add_argument("--shard-index", type=int, default=0, help="Shard crawled by this runner job (default: %(default)s)")
+    parser.add_argument("--shard-count", type=int, default=1, help="Runner jobs the categories are split over (default: %(default)s)")
+    parser.add_argument("--workers", type=int, default=1, help="Local worker processes, one sub-shard each (default: %(default)s)")
+    return parser.parse_args(argv)
+
+
+if __name__ == "__main__":
+    args = parse_args()
+    crawler = CategoryCrawler(load_sections(args.config, args.sections))
+    crawler.set_shard(args.shard_index, args.shard_count)
+    if args.workers > 1:
+        asyncio.run(crawler.run_sharded(args.workers))
+    else:
+        asyncio.run(crawler.run())
@@ -1,146 +1,373 @@
 # Import necessary libraries
 import pandas as pd
-import json
 import asyncio
 import nest_asyncio
 import re
-from playwright.async_api import async_playwright
+from bs4 import BeautifulSoup
+from collections import Counter
+from urllib.parse import urljoin
+from BrowserPool import BrowserPool
+from ExtractionEngine import ExtractionEngine, SELECTORS
+from FetchLimiter import FetchLimiter, FetchStatusError, THROTTLE_STATUSES, backoff_delay, is_transient
+from NextDataFetcher import is_not_found
+from RecordNormalizer import RELATIVE_TIME_PATTERN, DATE_FORMAT
+from RunMetrics import timed
+from NextData import parse_next_data, get_listing, map_listing, get_card_summaries, get_page_count, ad_id_from_link, get_basic_cards
 from datetime import datetime, timedelta
 from dateutil.relativedelta import relativedelta
 
 # Enable nested event loops (useful in Jupyter Notebooks)
 nest_asyncio.apply()
 
+# Fields returned by scrape_more_details, in output order
+DETAIL_FIELDS = (
+    'id', 'description', 'image', 'price', 'address', 'additional_details', 'specifications',
+    'views_no', 'submitter', 'ads', 'membership', 'phone', 'relative_date', 'date_published',
+)
+
+# Fields a plain-HTTP detail fetch must provide, otherwise the ad is re-fetched with Playwright
+HTTP_REQUIRED_FIELDS = ('id', 'date_published')
+
+# Words that mark the relative posting time among the detail page's data items
+RELATIVE_DATE_WORDS = ('منذ', 'ساعة', 'يوم', 'دقيقة', 'شهر')
+
+AD_ID_TEXT_PATTERN = re.compile(r'رقم الاعلان:\s*(\d+)')
+ADS_COUNT_PATTERN = re.compile(r'^\d+\s+(ads|اعلان|إعلان)$', re.IGNORECASE)
+MEMBERSHIP_PATTERN = re.compile(r'^(عضو منذ|member since) \D+\s+\d+$', re.IGNORECASE)
+
 # Scraper class to fetch detailed data from listing cards
 class DetailsScraping:
-    def __init__(self, url, retries=3):
+    def __init__(self, url, retries=3, browser_pool=None, fetch_limiter=None, detail_workers=4,
+                 extraction_mode="dom", field_sources=None, fetch_mode="browser", http_fetcher=None,
+                 target_date=None, seen_index=None, extraction_engine=None, next_data_fetcher=None,
+                 request_coalescer=None):
         self.url = url  # URL of the page to scrape
         self.retries = retries  # Number of retries on failure
+        self.browser_pool = browser_pool  # Shared BrowserPool; a temporary one is used when None
+        self.fetch_limiter = fetch_limiter  # Shared FetchLimiter (global cap + per-host rate), optional
+        self.detail_workers = detail_workers  # Detail pages fetched concurrently for one listing page
+        self.extraction_mode = extraction_mode  # "next_data" reads __NEXT_DATA__ first, "dom" uses the selector table only
+        self.field_sources = field_sources if field_sources is not None else Counter()  # "field:source" -> count
+        self.fetch_mode = fetch_mode  # "json" tries the Next.js data route, then "http" a plain HTML fetch, then Playwright ("browser")
+        self.http_fetcher = http_fetcher  # Shared HttpFetcher, required for the "http" fetch mode
+        self.target_date = target_date  # "YYYY-MM-DD"; cards dated on another day are skipped before their detail visit
+        self.reached_older_ads = False  # True once every non-pinned card on the page predates target_date
+        self.skipped_cards = 0  # Cards skipped by the date window
+        self.dated_in_window = 0  # Cards whose listing-level date falls on target_date
+        self.page_count = None  # Pages in the category, from the listing page's pagination metadata
+        self.listing_unchanged = False  # True when the listing page was unchanged and its cached cards were reused
+        self.seen_index = seen_index  # SeenAdsIndex of ads collected by earlier runs, optional
+        self.extraction_engine = extraction_engine or ExtractionEngine()  # One evaluate() per page
+        self.next_data_fetcher = next_data_fetcher  # Shared NextDataFetcher, required for the "json" fetch mode
+        self.request_coalescer = request_coalescer  # Shared RequestCoalescer: one detail visit per ad and run, optional
 
     # Main method to extract card-level data
     async def get_card_details(self):
-        async with async_playwright() as p:
-            browser = await p.chromium.launch(headless=True)  # Launch browser in headless mode
-            page = await browser.new_page()
-            page.set_default_navigation_timeout(30000)  # Set navigation timeout
-            page.set_default_timeout(30000)  # Set action timeout
-
-            cards = []  # Accumulator for all extracted cards
-
-            for attempt in range(self.retries):  # Retry logic
-                try:
-                    await page.goto(self.url, wait_until="domcontentloaded")  # Open the target page
-                    await page.wait_for_selector('.StackedCard_card__Kvggc', timeout=30000)  # Wait for card elements
-
-                    card_cards = await page.query_selector_all('.StackedCard_card__Kvggc')  # Select all card blocks
-                    for card in card_cards:
-                        # Extract basic info from card container
-                        link = await self.scrape_link(card)
-                        card_type = await self.scrape_card_type(card)
-                        title = await self.scrape_title(card)
-                        pinned_today = await self.scrape_pinned_today(card)
-
-                        # Extract detailed info by visiting the card’s link
-                        scrape_more_details = await self.scrape_more_details(link)
-
-                        # Construct the final card dictionary
-                        cards.append({
-                            'id': scrape_more_details.get('id'),
-                            'date_published': scrape_more_details.get('date_published'),
-                            'relative_date': scrape_more_details.get('relative_date'),
-                            'pin': pinned_today,
-                            'type': card_type,
-                            'title': title,
-                            'description': scrape_more_details.get('description'),
-                            'link': link,
-                            'image': scrape_more_details.get('image'),
-                            'price': scrape_more_details.get('price'),
-                            'address': scrape_more_details.get('address'),
-                            'additional_details': scrape_more_details.get('additional_details'),
-                            'specifications': scrape_more_details.get('specifications'),
-                            'views_no': scrape_more_details.get('views_no'),
-                            'submitter': scrape_more_details.get('submitter'),
-                            'ads': scrape_more_details.get('ads'),
-                            'membership': scrape_more_details.get('membership'),
-                            'phone': scrape_more_details.get('phone'),
-                        })
-                    break  # Exit retry loop on success
-
-                except Exception as e:
-                    print(f"Attempt {attempt + 1} failed for {self.url}: {e}")
-                    if attempt + 1 == self.retries:
-                        print(f"Max retries reached for {self.url}. Returning partial results.")
-                        break
-                finally:
-                    await page.close()  # Clean up page
-                    if attempt + 1 < self.retries:
-                        page = await browser.new_page()
-
-            await browser.close()  # Close browser session
-            return cards  # Return all collected cards
-
-    # Extract card link (relative path converted to absolute)
-    async def scrape_link(self, card):
-        rawlink = await card.get_attribute('href')
-        base_url = 'https://www.q84sale.com'
-        return f"{base_url}{rawlink}" if rawlink else None
-
-    # Extract the listing category/type
-    async def scrape_card_type(self, card):
-        selector = '.text-6-med.text-neutral_600.styles_category__NQAci'
-        element = await card.query_selector(selector)
-        return await element.inner_text() if element else None
-
-    # Extract listing title from card
-    async def scrape_title(self, card):
-        selector = '.text-4-med.text-neutral_900.styles_title__l5TTA.undefined'
-        element = await card.query_selector(selector)
-        return await element.inner_text() if element else None
-
-    # Extract description text from detailed listing page
-    async def scrape_description(self, page):
-        selector = '.styles_description__DpRnU'
-        element = await page.query_selector(selector)
-        return await element.inner_text() if element else "No Description"
-
-    # Determine if listing is pinned today
-    async def scrape_pinned_today(self, card):
-        selector = '.StackedCard_tags__SsKrH'
-        element = await card.query_selector(selector)
-        if element:
-            content = await element.inner_html()
-            if content.strip() != "":
-                return "Pinned today"
-        return "Not Pinned"
+        return await self._with_browser_pool(self._get_card_details)
+
+    async def _get_card_details(self):
+        basic_cards = await self._get_basic_cards()
+
+        # Extract detailed info by visiting the card links concurrently (listing page is already released)
+        workers = asyncio.Semaphore(self.detail_workers)
+
+        async def fetch_card(basic_card):
+            async with workers:
+                return await self.fetch_card(basic_card)
+
+        # gather keeps the cards in listing order
+        cards = await asyncio.gather(*(fetch_card(basic_card) for basic_card in basic_cards))
+        return list(cards)  # Return all collected cards
+
+    # Card-level info of the listing page within the date window, without visiting any detail page
+    async def get_basic_cards(self):
+        return await self._with_browser_pool(self._get_basic_cards)
+
+    async def _get_basic_cards(self):
+        basic_cards = None  # Card-level info collected from the listing page
+        if self.fetch_mode == "json" and self.next_data_fetcher is not None:
+            basic_cards = await self._try_fetch_path(self.url, self.scrape_cards_over_json)
+        if basic_cards is None and self.fetch_mode in ("http", "json"):
+            basic_cards = await self._try_fetch_path(self.url, self.scrape_cards_over_http)
+        if basic_cards is None:
+            basic_cards = await self.scrape_cards_with_browser()
+        return self.filter_cards_by_date(basic_cards)
+
+    # Complete one basic card with its detail page, or with the details stored by an earlier run
+    async def fetch_card(self, basic_card):
+        scrape_more_details = self.reuse_seen_details(basic_card)
+        if scrape_more_details is None and self.request_coalescer is not None:
+            # Repeated (pinned, shifted by pagination) or concurrent requests for the ad share one visit
+            scrape_more_details = await self.request_coalescer.fetch(
+                basic_card['link'], self.visit_details, remember=lambda details: bool(details.get('id'))
+            )
+        elif scrape_more_details is None:
+            scrape_more_details = await self.visit_details(basic_card['link'])
+        return self.build_card(basic_card, scrape_more_details)
+
+    # Visit an ad's detail page and remember complete results in the seen-ads index
+    async def visit_details(self, url):
+        scrape_more_details = await self.scrape_more_details(url)
+        if self.seen_index is not None and scrape_more_details.get('id'):
+            self.seen_index.add(self.seen_index.key_for(url), scrape_more_details)
+        return scrape_more_details
+
+    # Collect card-level info from the listing page with Playwright
+    @timed("scrape_cards_with_browser")
+    async def scrape_cards_with_browser(self):
+        basic_cards = []
+        for attempt in range(self.retries):  # Retry logic
+            try:
+                async with FetchLimiter.optional_slot(self.fetch_limiter, self.url), self.browser_pool.page() as page:
+                    await self._goto(page, self.url, wait_until="domcontentloaded")  # Open the target page
+                    await page.wait_for_selector(SELECTORS['card'], timeout=30000)  # Wait for card elements
+
+                    # All cards and the page's __NEXT_DATA__ in a single round-trip
+                    listing = await self.extraction_engine.extract_listing(page)
+                    basic_cards = [self.parse_card(raw_card) for raw_card in listing.get('cards') or []]
+                    self.apply_listing_data(basic_cards, parse_next_data(listing.get('next_data')))
+                break  # Exit retry loop on success
+
+            except Exception as e:
+                print(f"Attempt {attempt + 1} failed for {self.url}: {e}")
+                if attempt + 1 == self.retries:
+                    print(f"Max retries reached for {self.url}. Returning partial results.")
+                else:
+                    await self._retry_pause(attempt)
+        return basic_cards
+
+    # Turn the raw card fields returned by the extraction engine into a basic card
+    def parse_card(self, raw_card):
+        href = raw_card.get('href')
+        return {
+            'link': urljoin(self.url, href) if href else None,
+            'type': raw_card.get('type'),
+            'title': raw_card.get('title'),
+            'pin': "Pinned today" if (raw_card.get('tags_html') or '').strip() else "Not Pinned",
+        }
+
+    # Collect card-level info from the listing's Next.js data route; None means fall back to the HTML path
+    @timed("scrape_cards_over_json")
+    async def scrape_cards_over_json(self):
+        page, load_data = await self._fetch_with_retries(self.url, lambda: self.next_data_fetcher.fetch_page(self.url), limited=False)
+        basic_cards = self.cached_listing(page)
+        if basic_cards is not None:
+            return basic_cards
+        try:
+            data = load_data()
+        except ValueError as e:
+            print(f"Unreadable data route payload for {self.url}: {e}")
+            return None
+
+        basic_cards = get_basic_cards(data, self.url)
+        if basic_cards is not None:
+            self.apply_listing_data(basic_cards, data)
+            self.cache_listing(page, basic_cards)
+        return basic_cards
+
+    # Collect card-level info from the server-rendered listing HTML; None (unrecognised markup) means fall back to Playwright
+    @timed("scrape_cards_over_http")
+    async def scrape_cards_over_http(self):
+        page = await self._fetch_with_retries(self.url, lambda: self.http_fetcher.fetch_page(self.url))
+        basic_cards = self.cached_listing(page)
+        if basic_cards is not None:
+            return basic_cards
+
+        html = page.text
+        soup = BeautifulSoup(html, 'html.parser')
+        basic_cards = []
+        for card in soup.select(SELECTORS['card']):
+            rawlink = card.get('href')
+            card_type = card.select_one(SELECTORS['card_type'])
+            title = card.select_one(SELECTORS['card_title'])
+            tags = card.select_one(SELECTORS['card_tags'])
+            basic_cards.append({
+                'link': urljoin(self.url, rawlink) if rawlink else None,
+                'type': card_type.get_text(strip=True) if card_type else None,
+                'title': title.get_text(strip=True) if title else None,
+                'pin': "Pinned today" if tags and tags.decode_contents().strip() else "Not Pinned",
+            })
+        data = parse_next_data(html)
+        self.apply_listing_data(basic_cards, data)
+        if self.next_data_fetcher is not None:
+            self.next_data_fetcher.note_build_id(data)
+        if not basic_cards and data is None:
+            return None  # Neither cards nor __NEXT_DATA__: markup we do not recognise
+        self.cache_listing(page, basic_cards)
+        return basic_cards  # Empty for a page past the last one, which still carries its __NEXT_DATA__
+
+    # Cards parsed from an earlier copy of an unchanged listing page (None when changed or not cached)
+    def cached_listing(self, page):
+        cache = self.http_fetcher.cache
+        parsed = cache.parsed(page) if cache is not None else None
+        if parsed is None:
+            return None
+        self.listing_unchanged = True
+        self.page_count = parsed['page_count']
+        return parsed['cards']
+
+    # Remember the cards parsed from a listing page, reused while the page stays unchanged
+    def cache_listing(self, page, basic_cards):
+        if self.http_fetcher.cache is not None:
+            self.http_fetcher.cache.set_parsed(page, {'cards': basic_cards, 'page_count': self.page_count})
+
+    # Store the page count and each card's listing-level publish date, price and views (when known)
+    def apply_listing_data(self, basic_cards, data):
+        self.page_count = get_page_count(data)
+        card_summaries = get_card_summaries(data)
+        for basic_card in basic_cards:
+            summary = card_summaries.get(ad_id_from_link(basic_card.get('link')), {})
+            basic_card['listing_date'] = summary.get('date_published')
+            basic_card['listing_price'] = summary.get('price')
+            basic_card['listing_views'] = summary.get('views_no')
+
+    # Day ("YYYY-MM-DD") of a card's listing-level publish date, None when the listing did not date it
+    @staticmethod
+    def listing_day(basic_card):
+        return basic_card.get('listing_date').split()[0] if basic_card.get('listing_date') else None
+
+    # Drop cards dated outside target_date and note when the page is entirely older than it
+    def filter_cards_by_date(self, basic_cards):
+        if not self.target_date:
+            return basic_cards
+
+        kept = []
+        unpinned_days = []  # Pinned cards can be old, so they never decide the stop
+        for basic_card in basic_cards:
+            card_day = self.listing_day(basic_card)
+            if basic_card.get('pin') != "Pinned today":
+                unpinned_days.append(card_day)
+            if card_day is not None and card_day != self.target_date:
+                self.skipped_cards += 1
+                continue
+            if card_day is not None:
+                self.dated_in_window += 1
+            kept.append(basic_card)
+
+        self.reached_older_ads = bool(unpinned_days) and all(
+            day is not None and day < self.target_date for day in unpinned_days
+        )
+        return kept
+
+    # Return stored details for an ad collected by an earlier run, with volatile fields refreshed from the card
+    def reuse_seen_details(self, basic_card):
+        if self.seen_index is None or not basic_card.get('link'):
+            return None
+        details = self.seen_index.get(self.seen_index.key_for(basic_card['link']))
+        if details is None:
+            return None
+        if basic_card.get('listing_price') is not None:
+            details['price'] = basic_card['listing_price']
+        if basic_card.get('listing_views') is not None:
+            details['views_no'] = basic_card['listing_views']
+        return details
+
+    # Construct the final card dictionary from card-level and detail-level data
+    def build_card(self, basic_card, scrape_more_details):
+        return {
+            'id': scrape_more_details.get('id'),
+            'date_published': scrape_more_details.get('date_published'),
+            'relative_date': scrape_more_details.get('relative_date'),
+            'pin': basic_card.get('pin'),
+            'type': basic_card.get('type'),
+            'title': basic_card.get('title'),
+            'description': scrape_more_details.get('description'),
+            'link': basic_card.get('link'),
+            'image': scrape_more_details.get('image'),
+            'price': scrape_more_details.get('price'),
+            'address': scrape_more_details.get('address'),
+            'additional_details': scrape_more_details.get('additional_details'),
+            'specifications': scrape_more_details.get('specifications'),
+            'views_no': scrape_more_details.get('views_no'),
+            'submitter': scrape_more_details.get('submitter'),
+            'ads': scrape_more_details.get('ads'),
+            'membership': scrape_more_details.get('membership'),
+            'phone': scrape_more_details.get('phone'),
+            'fetched_at': scrape_more_details.get('fetched_at'),
+        }
+
+    # Navigate a pooled page; 429/5xx answers raise so the limiter backs off and the caller retries
+    async def _goto(self, page, url, **kwargs):
+        response = await self.browser_pool.goto(page, url, **kwargs)
+        if response is not None and response.status in THROTTLE_STATUSES:
+            retry_after = response.headers.get('retry-after')
+            raise FetchStatusError(url, response.status, float(retry_after) if retry_after and retry_after.isdigit() else None)
+        return response
+
+    # Jittered exponential pause before retrying a failed fetch
+    async def _retry_pause(self, attempt):
+        if self.fetch_limiter is not None:
+            delay = self.fetch_limiter.backoff_delay(attempt)
+        else:
+            delay = backoff_delay(attempt)
+        await asyncio.sleep(delay)
+
+    # Await fetch(); 429/5xx answers, timeouts and dropped connections are retried on the same path after the
+    # limiter's backoff and anything else is raised. limited=False for fetchers that hold their own limiter slot (NextDataFetcher)
+    async def _fetch_with_retries(self, url, fetch, limited=True):
+        for attempt in range(self.retries):
+            try:
+                if not limited:
+                    return await fetch()
+                async with FetchLimiter.optional_slot(self.fetch_limiter, url):
+                    return await fetch()
+            except Exception as e:
+                if not is_transient(e) or attempt + 1 == self.retries:
+                    raise
+                print(f"Attempt {attempt + 1} failed for {url}: {e}")
+                await self._retry_pause(attempt)
+
+    # Run one plain fetch path; None when it still fails after its retries, so the next path is tried.
+    # A 404 is raised: the page is gone and no other path would find it
+    async def _try_fetch_path(self, url, scrape, *args):
+        try:
+            return await scrape(*args)
+        except Exception as e:
+            if is_not_found(e):
+                raise
+            print(f"{scrape.__name__} failed for {url}, trying the next path: {e}")
+            return None
+
+    # Run a coroutine with the shared pool, or a short-lived one when used standalone
+    async def _with_browser_pool(self, func, *args):
+        if self.browser_pool is not None:
+            return await func(*args)
+        self.browser_pool = BrowserPool()
+        try:
+            return await func(*args)
+        finally:
+            await self.browser_pool.close()
+            self.browser_pool = None
 
     # Extract relative posting time (e.g., منذ ساعة)
+    @timed("scrape_relative_date")
     async def scrape_relative_date(self, page):
         try:
-            parent_locator = page.locator('.d-flex.styles_topData__Sx1GF')
+            parent_locator = page.locator(SELECTORS['top_data'])
             await parent_locator.wait_for(state="visible", timeout=10000)
-            data_items = page.locator('.d-flex.align-items-center.styles_dataWithIcon__For9u')
+            data_items = page.locator(SELECTORS['data_item'])
             items = await data_items.all()
 
             for item in items:
                 text = await item.inner_text()
-                if any(word in text for word in ['منذ', 'ساعة', 'يوم', 'دقيقة', 'شهر']):
-                    time_element = await item.locator('.text-5-regular.m-text-6-med.text-neutral_600').inner_text()
+                if any(word in text for word in RELATIVE_DATE_WORDS):
+                    time_element = await item.locator(SELECTORS['data_item_value']).inner_text()
                     return time_element.strip()
             return None
         except Exception as e:
             print(f"Error while scraping relative_date: {e}")
             return None
 
-    # Convert relative time to full timestamp
-    async def scrape_publish_date(self, relative_time):
-        relative_time_pattern = r'(\d+)\s+(Second|Minute|Hour|Day|Month|شهر|ثانية|دقيقة|ساعة|يوم)'
-        match = re.search(relative_time_pattern, relative_time, re.IGNORECASE)
+    # Convert relative time to full timestamp, counted back from when the page was fetched
+    @timed("scrape_publish_date")
+    async def scrape_publish_date(self, relative_time, fetched_at=None):
+        match = RELATIVE_TIME_PATTERN.search(relative_time)
         if not match:
             return "Invalid Relative Time"
 
         number = int(match.group(1))
         unit = match.group(2).lower()
-        current_time = datetime.now()
+        current_time = fetched_at or datetime.now()
 
         # Adjust time based on unit
         if unit in ["second", "ثانية"]:
@@ -156,179 +383,170 @@ class DetailsScraping:
         else:
             return "Unsupported time unit found."
 
-        return publish_time.strftime("%Y-%m-%d %H:%M:%S")
+        return publish_time.strftime(DATE_FORMAT)
 
-    # Extract number of views on the listing
-    async def scrape_views_no(self, page):
+    # Read the whole listing record from __NEXT_DATA__; selectors only fill the fields it lacks
+    @timed("scrape_details_from_next_data")
+    async def scrape_details_from_next_data(self, page, fetched_at=None):
         try:
-            views_selector = '.d-flex.align-items-center.styles_dataWithIcon__For9u .text-5-regular.m-text-6-med.text-neutral_600'
-            views_element = await page.query_selector(views_selector)
-            if views_element:
-                views_no = await views_element.inner_text()
-                return views_no.strip()
-            return None
+            data = parse_next_data(await page.inner_html('script#__NEXT_DATA__'))
         except Exception as e:
-            print(f"Error while scraping views number: {e}")
-            return None
-
-    # Extract ad/listing ID from the page
-    async def scrape_id(self, page):
-        parent_selector = '.el-lvl-1.d-flex.align-items-center.justify-content-between.styles_sectionWrapper__v97PG'
-        parent_element = await page.query_selector(parent_selector)
-        if not parent_element:
-            print("Parent element not found")
-            return None
-
-        ad_id_selector = '.text-4-regular.m-text-5-med.text-neutral_600'
-        ad_id_element = await parent_element.query_selector(ad_id_selector)
-        if not ad_id_element:
-            print("Ad ID element not found within parent")
-            return None
-
-        text = await ad_id_element.inner_text()
-        match = re.search(r'رقم الاعلان:\s*(\d+)', text)
-        return match.group(1) if match else None
-
-    # Extract image URL
-    async def scrape_image(self, page):
+            print(f"Error while reading __NEXT_DATA__: {e}")
+            data = None
+        details = map_listing(get_listing(data))
+        for field in details:
+            self.field_sources[f"{field}:next_data"] += 1
+
+        missing = [field for field in DETAIL_FIELDS if field not in details]
+        if missing:
+            details.update(await self.scrape_details_from_dom(page, missing, fetched_at))
+        return {field: details.get(field) for field in DETAIL_FIELDS}
+
+    # Extract the requested detail fields (all by default) with a single evaluate() over the selector table
+    @timed("scrape_details_from_dom")
+    async def scrape_details_from_dom(self, page, fields=DETAIL_FIELDS, fetched_at=None):
+        parsed = self.parse_detail_fields(await self.extraction_engine.extract_details(page))
+        details = {field: parsed[field] for field in fields if field in parsed}
+
+        if 'relative_date' in fields or 'date_published' in fields:
+            # The date item can render late; only then pay for the waiting per-field extractor
+            relative_date = parsed['relative_date'] or await self.scrape_relative_date(page)
+            details['relative_date'] = relative_date
+            details['date_published'] = await self.scrape_publish_date(relative_date, fetched_at) if relative_date else None
+
+        for field in details:
+            self.field_sources[f"{field}:dom"] += 1
+        return details
+
+    # Turn the raw detail fields returned by the extraction engine into scrape_more_details fields
+    @timed("parse_detail_fields")
+    def parse_detail_fields(self, raw):
+        id_match = AD_ID_TEXT_PATTERN.search(((raw.get('id_text') or {}).get('text')) or '')
+        address = raw.get('address')
+        if not address or re.match(r'^رقم الاعلان: \d+$', address):
+            address = "Not Mentioned"
+
+        specifications = {}
+        for attr in raw.get('specifications') or []:
+            if attr.get('name') and attr.get('value'):
+                specifications[attr['name']] = attr['value'].strip()
+
+        relative_date = None
+        for item in raw.get('data_items') or []:
+            if any(word in (item.get('text') or '') for word in RELATIVE_DATE_WORDS) and item.get('value'):
+                relative_date = item['value'].strip()
+                break
+        data_items = raw.get('data_items') or []
+        views_no = data_items[0].get('value') if data_items else None
+
+        submitter_block = raw.get('submitter_block')
+        submitter_details = self.classify_member_details(submitter_block) if submitter_block else {}
+
+        listing = get_listing(parse_next_data(raw.get('next_data')))
+
+        return {
+            'id': id_match.group(1) if id_match else None,
+            'description': raw.get('description') or "No Description",
+            'image': raw.get('image'),
+            'price': raw.get('price') or "0 KWD",
+            'address': address,
+            'additional_details': [value.strip() for value in raw.get('additional_details') or [] if value and value.strip()],
+            'specifications': specifications,
+            'views_no': views_no.strip() if views_no else None,
+            'submitter': submitter_details.get('submitter'),
+            'ads': submitter_details.get('ads'),
+            'membership': submitter_details.get('membership'),
+            'phone': listing.get('phone') if listing else None,
+            'relative_date': relative_date,
+        }
+
+    # Pick the ad count and membership line out of the submitter block's detail texts
+    def classify_member_details(self, submitter_block):
+        ads = "0 ads"
+        membership = "membership year not mentioned"
+        for detail_text in submitter_block.get('details') or []:
+            if ADS_COUNT_PATTERN.match(detail_text):
+                ads = detail_text
+            elif MEMBERSHIP_PATTERN.match(detail_text):
+                membership = detail_text
+        return {
+            'submitter': submitter_block.get('submitter'),
+            'ads': ads,
+            'membership': membership
+        }
+
+    # Scrape full details from a single ad URL; a heavier path is only tried when a fetched page can't be parsed
+    @timed("scrape_more_details")
+    async def scrape_more_details(self, url):
         try:
-            image_selector = '.styles_img__PC9G3'
-            image = await page.query_selector(image_selector)
-            return await image.get_attribute('src') if image else None
+            if self.fetch_mode == "json" and self.next_data_fetcher is not None:
+                details = await self._try_fetch_path(url, self.scrape_details_over_json, url)
+                if details is not None:
+                    return details
+            if self.fetch_mode in ("http", "json"):
+                details = await self._try_fetch_path(url, self.scrape_details_over_http, url)
+                if details is not None:
+                    return details
         except Exception as e:
-            print(f"Error scraping image: {e}")
-            return None
-
-    # Extract price value
-    async def scrape_price(self, page):
-        price_selector = '.h3.m-h5.text-prim_4sale_500'
-        price = await page.query_selector(price_selector)
-        return await price.inner_text() if price else "0 KWD"
-
-    # Extract address or return fallback
-    async def scrape_address(self, page):
-        address_selector = '.text-4-regular.m-text-5-med.text-neutral_600'
-        address = await page.query_selector(address_selector)
-        if address:
-            text = await address.inner_text()
-            if re.match(r'^رقم الاعلان: \d+$', text):
-                return "Not Mentioned"
-            return text
-        return "Not Mentioned"
-
-    # Extract Boolean tags (e.g., features, services)
-    async def scrape_additionalDetails_list(self, page):
-        selector = '.styles_boolAttrs__Ce6YV .styles_boolAttr__Fkh_j div'
-        elements = await page.query_selector_all(selector)
-        values_list = [await element.inner_text() for element in elements if await element.inner_text()]
-        return [val.strip() for val in values_list if val.strip()]
-
-    # Extract all attribute specifications
-    async def scrape_specifications(self, page):
-        selector = '.styles_attrs__PX5Fs .styles_attr__BN3w_'
-        elements = await page.query_selector_all(selector)
-        attributes = {}
-
-        for element in elements:
-            img_element = await element.query_selector('img')
-            if img_element:
-                alt_text = await img_element.get_attribute('alt')
-                text_element = await element.query_selector('.text-4-med.m-text-5-med.text-neutral_900')
-                if text_element:
-                    value = await text_element.inner_text()
-                    if alt_text and value:
-                        attributes[alt_text] = value.strip()
-        return attributes
-
-    # Extract phone number from embedded JSON in the page
-    async def scrape_phone_number(self, page):
+            # Gone (404): no other path would find it. No id, so the journal leaves it for a later attempt
+            print(f"Giving up on {url}: {e}")
+            return {}
+        return await self._with_browser_pool(self._scrape_more_details, url)
+
+    # Read the detail record from the server-rendered HTML; None means fall back to Playwright
+    @timed("scrape_details_over_http")
+    async def scrape_details_over_http(self, url):
+        html = await self._fetch_with_retries(url, lambda: self.http_fetcher.fetch_text(url))
+        fetched_at = datetime.now()
+
+        data = parse_next_data(html)
+        if self.next_data_fetcher is not None:
+            self.next_data_fetcher.note_build_id(data)
+        return self.details_from_data(data, "http", fetched_at)
+
+    # Read the detail record from the ad's Next.js data route; None means fall back to the HTML path
+    @timed("scrape_details_over_json")
+    async def scrape_details_over_json(self, url):
+        _, load_data = await self._fetch_with_retries(
+            url, lambda: self.next_data_fetcher.fetch_page(url, use_cache=False), limited=False
+        )
+        fetched_at = datetime.now()
         try:
-            script_content = await page.inner_html('script#__NEXT_DATA__')
-            if script_content:
-                data = json.loads(script_content.strip())
-                phone_number = data.get("props", {}).get("pageProps", {}).get("listing", {}).get("phone", None)
-                return phone_number
+            data = load_data()
+        except ValueError as e:
+            print(f"Unreadable data route payload for {url}: {e}")
             return None
-        except Exception as e:
-            print(f"Error while scraping phone number: {e}")
+        return self.details_from_data(data, "json", fetched_at)
+
+    # Map a detail page payload to the scrape_more_details fields; None when a required field is missing
+    def details_from_data(self, data, source, fetched_at):
+        details = map_listing(get_listing(data))
+        if any(details.get(field) is None for field in HTTP_REQUIRED_FIELDS):
             return None
+        for field in details:
+            self.field_sources[f"{field}:{source}"] += 1
+        return {**{field: details.get(field) for field in DETAIL_FIELDS}, 'fetched_at': fetched_at.strftime(DATE_FORMAT)}
 
-    # Extract submitter name, ad count, and membership info
-    async def scrape_submitter_details(self, page):
-        info_wrapper_selector = '.styles_infoWrapper__v4P8_.undefined.align-items-center'
-        info_wrappers = await page.query_selector_all(info_wrapper_selector)
-
-        if len(info_wrappers) > 0:
-            second_div = info_wrappers[0]
-            submitter_selector = '.text-4-med.m-h6.text-neutral_900'
-            submitter_element = await second_div.query_selector(submitter_selector)
-            submitter = await submitter_element.inner_text() if submitter_element else None
-
-            details_selector = '.styles_memberDate__qdUsm span.text-neutral_600'
-            detail_elements = await second_div.query_selector_all(details_selector)
-
-            ads = "0 ads"
-            membership = "membership year not mentioned"
-
-            for detail_element in detail_elements:
-                detail_text = await detail_element.inner_text()
-                if re.match(r'^\d+\s+ads$', detail_text, re.IGNORECASE) or re.match(r'^\d+\s+اعلان$', detail_text, re.IGNORECASE) or re.match(r'^\d+\s+إعلان$', detail_text, re.IGNORECASE):
-                    ads = detail_text
-                elif re.match(r'^عضو منذ \D+\s+\d+$', detail_text) or re.match(r'^member since \D+\s+\d+$', detail_text, re.IGNORECASE):
-                    membership = detail_text
-
-            return {
-                'submitter': submitter,
-                'ads': ads,
-                'membership': membership
-            }
-        return {}
-
-    # Scrape full details from a single ad URL
-    async def scrape_more_details(self, url):
+    @timed("scrape_more_details_browser")
+    async def _scrape_more_details(self, url):
         retries = 3
         for attempt in range(retries):
             try:
-                async with async_playwright() as p:
-                    browser = await p.chromium.launch(headless=True)
-                    page = await browser.new_page()
-                    await page.goto(url, wait_until="domcontentloaded", timeout=60000)
-
-                    # Extract everything
-                    id = await self.scrape_id(page)
-                    description = await self.scrape_description(page)
-                    image = await self.scrape_image(page)
-                    price = await self.scrape_price(page)
-                    address = await self.scrape_address(page)
-                    additional_details = await self.scrape_additionalDetails_list(page)
-                    specifications = await self.scrape_specifications(page)
-                    views_no = await self.scrape_views_no(page)
-                    submitter_details = await self.scrape_submitter_details(page)
-                    phone = await self.scrape_phone_number(page)
-                    relative_date = await self.scrape_relative_date(page)
-                    date_published = await self.scrape_publish_date(relative_date) if relative_date else None
-
-                    await browser.close()
-                    return {
-                        'id': id,
-                        'description': description,
-                        'image': image,
-                        'price': price,
-                        'address': address,
-                        'additional_details': additional_details,
-                        'specifications': specifications,
-                        'views_no': views_no,
-                        'submitter': submitter_details.get('submitter'),
-                        'ads': submitter_details.get('ads'),
-                        'membership': submitter_details.get('membership'),
-                        'phone': phone,
-                        'relative_date': relative_date,
-                        'date_published': date_published,
-                    }
+                async with FetchLimiter.optional_slot(self.fetch_limiter, url), self.browser_pool.page() as page:
+                    await self._goto(page, url, wait_until="domcontentloaded", timeout=60000)
+                    fetched_at = datetime.now()  # Relative dates on the page count back from here
+
+                    if self.extraction_mode == "next_data":
+                        details = await self.scrape_details_from_next_data(page, fetched_at)
+                    else:
+                        details = await self.scrape_details_from_dom(page, fetched_at=fetched_at)
+                    details['fetched_at'] = fetched_at.strftime(DATE_FORMAT)
+                    return details
             except Exception as e:
                 print(f"Error while scraping more details from {url}: {e}")
                 if attempt + 1 == retries:
                     print(f"Max retries reached for {url}. Returning partial results.")
                     return {}
+                await self._retry_pause(attempt)
 
-        return {}
+        return {}
\ No newline at end of file
@@ -0,0 +1,204 @@
+import os
+import re
+import threading
+import itertools
+import httplib2
+import google_auth_httplib2
+from google.oauth2.service_account import Credentials
+from googleapiclient.discovery import build
+from googleapiclient.errors import HttpError
+from googleapiclient.http import HttpRequest, MediaFileUpload
+from RunMetrics import metrics
+
+FOLDER_MIME_TYPE = 'application/vnd.google-apps.folder'
+
+
+# Process-wide Google Drive client: one authenticated service, memoized folder ids, lazy refresh on 401
+class DriveClient:
+    _shared = {}  # (client_email, scopes) -> DriveClient, so every entry point reuses one client
+    _shared_lock = threading.Lock()
+
+    def __init__(self, credentials_dict=None, scopes=None, service=None):
+        self.credentials_dict = credentials_dict  # Service account info; unused when service is given
+        self.scopes = scopes or ['https://www.googleapis.com/auth/drive']
+        self.credentials = None
+        self.refresh_count = 0  # Credential refreshes triggered by 401 responses
+        self.folder_lookups = 0  # Folder searches actually sent to Drive
+        self._service = service  # Pre-built (or fake) service
+        self._folder_ids = {}  # (parent_id, name) -> folder id
+        self._lock = threading.RLock()  # Re-entrant: folder creation may build or refresh the service
+
+    @classmethod
+    def shared(cls, credentials_dict, scopes=None):
+        """Return the process-wide client for these credentials, creating it once."""
+        scopes = scopes or ['https://www.googleapis.com/auth/drive']
+        key = (credentials_dict.get('client_email'), tuple(scopes))
+        with cls._shared_lock:
+            if key not in cls._shared:
+                cls._shared[key] = cls(credentials_dict, scopes)
+            return cls._shared[key]
+
+    @property
+    def service(self):
+        """The Drive v3 service, built on first use."""
+        if self._service is None:
+            with self._lock:
+                if self._service is None:
+                    self._service = self._build_service()
+        return self._service
+
+    def _build_service(self):
+        print("Authenticating with Google Drive...")
+        self.credentials = Credentials.from_service_account_info(self.credentials_dict, scopes=self.scopes)
+
+        # Give every request its own HTTP connection so the service can be used from several threads
+        def build_request(http, *args, **kwargs):
+            return HttpRequest(google_auth_httplib2.AuthorizedHttp(self.credentials, http=httplib2.Http()), *args, **kwargs)
+
+        service = build('drive', 'v3', credentials=self.credentials, requestBuilder=build_request)
+        print("Authentication successful.")
+        return service
+
+    def _refresh_credentials(self):
+        with self._lock:
+            if self.credentials is not None:
+                self.credentials.refresh(google_auth_httplib2.Request(httplib2.Http()))
+                self.refresh_count += 1
+
+    def execute(self, make_request, stage="drive_call"):
+        """Build and execute a request; on 401 refresh the credentials once and retry."""
+        try:
+            with metrics.timer(stage):
+                return make_request(self.service).execute()
+        except HttpError as e:
+            if e.resp.status != 401 or self.credentials is None:
+                raise
+            print("Drive returned 401, refreshing credentials...")
+            self._refresh_credentials()
+            with metrics.timer(stage):
+                return make_request(self.service).execute()
+
+    def get_file(self, file_id):
+        """Return the metadata of a file or folder."""
+        return self.execute(lambda service: service.files().get(fileId=file_id), stage="drive_get_file")
+
+    def get_folder_id(self, parent_id, folder_name):
+        """Get a folder id by name within parent_id (memoized for the process)."""
+        key = (parent_id, folder_name)
+        if key in self._folder_ids:
+            return self._folder_ids[key]
+
+        query = (f"name='{folder_name}' and "
+                 f"'{parent_id}' in parents and "
+                 f"mimeType='{FOLDER_MIME_TYPE}' and "
+                 f"trashed=false")
+        # Oldest first: runners creating the same folder concurrently all settle on the first one
+        results = self.execute(lambda service: service.files().list(q=query, spaces='drive', fields='files(id, name)', orderBy='createdTime'), stage="drive_list_folder")
+        self.folder_lookups += 1
+        files = results.get('files', [])
+        if not files:
+            return None
+        self._folder_ids[key] = files[0]['id']
+        return files[0]['id']
+
+    def create_folder(self, parent_id, folder_name):
+        """Create a folder in parent_id and remember its id."""
+        file_metadata = {'name': folder_name, 'mimeType': FOLDER_MIME_TYPE, 'parents': [parent_id]}
+        folder = self.execute(lambda service: service.files().create(body=file_metadata, fields='id'), stage="drive_create_folder")
+        self._folder_ids[(parent_id, folder_name)] = folder.get('id')
+        return folder.get('id')
+
+    def get_or_create_folder(self, parent_id, folder_name):
+        """Return the folder id, creating the folder once even when called from several threads."""
+        with self._lock:
+            folder_id = self.get_folder_id(parent_id, folder_name)
+            if folder_id:
+                return folder_id
+            created_id = self.create_folder(parent_id, folder_name)
+            # Another shard may have created it at the same time: re-list and use the oldest copy
+            self._folder_ids.pop((parent_id, folder_name), None)
+            return self.get_folder_id(parent_id, folder_name) or created_id
+
+    def upload_file(self, file_name, folder_id, chunk_size=5 * 1024 * 1024):
+        """Upload a file as resumable chunks; returns the new file id."""
+        file_metadata = {'name': os.path.basename(file_name), 'parents': [folder_id]}
+        for attempt in range(2):
+            media = MediaFileUpload(file_name, chunksize=chunk_size, resumable=True)
+            request = self.service.files().create(body=file_metadata, media_body=media, fields='id')
+            try:
+                file = None
+                with metrics.timer("drive_upload"):
+                    while file is None:
+                        status, file = request.next_chunk()
+                metrics.add_bytes("drive_upload", os.path.getsize(file_name))
+                return file.get('id')
+            except HttpError as e:
+                if e.resp.status != 401 or self.credentials is None or attempt == 1:
+                    raise
+                print("Drive returned 401, refreshing credentials...")
+                self._refresh_credentials()
+
+    def stats(self):
+        """Return client counters for the run."""
+        return {
+            'folder_lookups': self.folder_lookups,
+            'cached_folders': len(self._folder_ids),
+            'refresh_count': self.refresh_count,
+        }
+
+
+# In-memory stand-in for the Drive v3 service, for running the upload path offline
+class FakeDriveService:
+    def __init__(self):
+        self.files_by_id = {}  # file id -> metadata dict
+        self.calls = []  # (method, kwargs) for every request executed
+        self._ids = itertools.count(1)
+
+    def files(self):
+        return _FakeFilesResource(self)
+
+
+class _FakeRequest:
+    def __init__(self, result):
+        self._result = result
+
+    def execute(self):
+        return self._result()
+
+    def next_chunk(self):
+        return None, self._result()
+
+
+class _FakeFilesResource:
+    def __init__(self, drive):
+        self.drive = drive
+
+    def get(self, fileId, **kwargs):
+        def result():
+            self.drive.calls.append(('get', {'fileId': fileId}))
+            if fileId not in self.drive.files_by_id:
+                return {'id': fileId}  # Parent folders are assumed to exist
+            return self.drive.files_by_id[fileId]
+        return _FakeRequest(result)
+
+    def list(self, q='', **kwargs):
+        def result():
+            self.drive.calls.append(('list', {'q': q}))
+            name = re.search(r"name='([^']*)'", q)
+            parent = re.search(r"'([^']*)' in parents", q)
+            files = [
+                {'id': meta['id'], 'name': meta['name']}
+                for meta in self.drive.files_by_id.values()
+                if (not name or meta['name'] == name.group(1))
+                and (not parent or parent.group(1) in meta.get('parents', []))
+            ]
+            return {'files': files}
+        return _FakeRequest(result)
+
+    def create(self, body=None, media_body=None, **kwargs):
+        def result():
+            self.drive.calls.append(('create', {'body': body}))
+            file_id = f"fake-{next(self.drive._ids)}"
+            self.drive.files_by_id[file_id] = dict(body or {}, id=file_id)
+            return {'id': file_id}
+        return _FakeRequest(result)
@@ -0,0 +1,69 @@
+import asyncio
+import logging
+from concurrent.futures import ThreadPoolExecutor
+from functools import partial
+from FetchLimiter import backoff_delay
+
+
+# Runs the blocking Google Drive calls of a SavingOnDrive* saver in a thread pool
+class DriveUploadService:
+    def __init__(self, drive_saver, max_workers=3, retries=3, base_delay=2, max_delay=60, logger=None):
+        self.drive_saver = drive_saver  # SavingOnDrive instance (one per section)
+        self.max_workers = max_workers  # Files uploaded in parallel
+        self.retries = retries  # Attempts per file
+        self.base_delay = base_delay  # First backoff delay (seconds), doubled on each retry
+        self.max_delay = max_delay  # Upper bound for a single backoff delay
+        self.logger = logger or logging.getLogger(__name__)
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="drive-upload")
+        self._semaphore = asyncio.Semaphore(max_workers)
+        self._tasks = []  # Background upload jobs started with submit()
+
+    async def run(self, func, *args):
+        """Run a blocking Drive call without stalling the event loop."""
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self._executor, partial(func, *args))
+
+    async def get_or_create_folder(self, folder_name):
+        """Return the id of folder_name under the parent folder, creating it if needed (memoized by the client)."""
+        return await self.run(self.drive_saver.get_or_create_folder, folder_name)
+
+    async def upload_file(self, file, folder_id):
+        """Upload one file with retries; returns the Drive file id or None."""
+        for attempt in range(self.retries):
+            try:
+                async with self._semaphore:
+                    file_id = await self.run(self.drive_saver.upload_file, file, folder_id)
+                if not file_id:
+                    raise Exception("Upload returned no file ID")
+                return file_id
+            except Exception as e:
+                self.logger.error(f"Upload attempt {attempt + 1} failed for {file}: {e}")
+                if attempt + 1 == self.retries:
+                    self.logger.error(f"Failed to upload {file} after {self.retries} attempts")
+                    return None
+                delay = backoff_delay(attempt, self.base_delay, self.max_delay)
+                self.logger.info(f"Retrying {file} after {delay:.1f} seconds...")
+                await asyncio.sleep(delay)
+        return None
+
+    async def upload_files(self, files, folder_id):
+        """Upload files in parallel; returns their Drive ids (None for failures) in input order."""
+        return await asyncio.gather(*(self.upload_file(file, folder_id) for file in files))
+
+    def submit(self, coro):
+        """Run an upload job in the background so scraping can continue meanwhile."""
+        task = asyncio.create_task(coro)
+        self._tasks.append(task)
+        return task
+
+    async def wait(self):
+        """Wait for every background upload job to finish."""
+        tasks, self._tasks = self._tasks, []
+        results = await asyncio.gather(*tasks, return_exceptions=True)
+        for result in results:
+            if isinstance(result, Exception):
+                self.logger.error(f"Background upload failed: {result}")
+
+    def close(self):
+        """Shut the thread pool down."""
+        self._executor.shutdown(wait=True)
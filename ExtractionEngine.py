@@ -0,0 +1,129 @@
+from RunMetrics import metrics
+
+# Every CSS selector the scraper relies on, in one place
+SELECTORS = {
+    # Listing page
+    'card': '.StackedCard_card__Kvggc',
+    'card_type': '.text-6-med.text-neutral_600.styles_category__NQAci',
+    'card_title': '.text-4-med.text-neutral_900.styles_title__l5TTA.undefined',
+    'card_tags': '.StackedCard_tags__SsKrH',
+    # Detail page
+    'description': '.styles_description__DpRnU',
+    'id_parent': '.el-lvl-1.d-flex.align-items-center.justify-content-between.styles_sectionWrapper__v97PG',
+    'id_text': '.text-4-regular.m-text-5-med.text-neutral_600',
+    'image': '.styles_img__PC9G3',
+    'price': '.h3.m-h5.text-prim_4sale_500',
+    'address': '.text-4-regular.m-text-5-med.text-neutral_600',
+    'bool_attr': '.styles_boolAttrs__Ce6YV .styles_boolAttr__Fkh_j div',
+    'attr': '.styles_attrs__PX5Fs .styles_attr__BN3w_',
+    'attr_value': '.text-4-med.m-text-5-med.text-neutral_900',
+    'top_data': '.d-flex.styles_topData__Sx1GF',
+    'data_item': '.d-flex.align-items-center.styles_dataWithIcon__For9u',
+    'data_item_value': '.text-5-regular.m-text-6-med.text-neutral_600',
+    'info_wrapper': '.styles_infoWrapper__v4P8_.undefined.align-items-center',
+    'submitter': '.text-4-med.m-h6.text-neutral_900',
+    'member_detail': '.styles_memberDate__qdUsm span.text-neutral_600',
+    'next_data': 'script#__NEXT_DATA__',
+}
+
+# Extraction specs: "selector" (first match, or every match with "all"), then one of
+# "attr" (attribute), "html" (innerHTML), "fields" (nested spec per key) or innerText by default.
+CARD_LIST_SPEC = {
+    'selector': SELECTORS['card'],
+    'all': True,
+    'fields': {
+        'href': {'attr': 'href'},
+        'type': {'selector': SELECTORS['card_type']},
+        'title': {'selector': SELECTORS['card_title']},
+        'tags_html': {'selector': SELECTORS['card_tags'], 'html': True},
+    },
+}
+
+# Listing page: every card plus the page's __NEXT_DATA__ (dates, pagination) in one call
+LISTING_PAGE_SPEC = {
+    'fields': {
+        'cards': CARD_LIST_SPEC,
+        'next_data': {'selector': SELECTORS['next_data'], 'html': True},
+    },
+}
+
+DETAIL_PAGE_SPEC = {
+    'fields': {
+        'id_text': {'selector': SELECTORS['id_parent'], 'fields': {'text': {'selector': SELECTORS['id_text']}}},
+        'description': {'selector': SELECTORS['description']},
+        'image': {'selector': SELECTORS['image'], 'attr': 'src'},
+        'price': {'selector': SELECTORS['price']},
+        'address': {'selector': SELECTORS['address']},
+        'additional_details': {'selector': SELECTORS['bool_attr'], 'all': True},
+        'specifications': {
+            'selector': SELECTORS['attr'],
+            'all': True,
+            'fields': {
+                'name': {'selector': 'img', 'attr': 'alt'},
+                'value': {'selector': SELECTORS['attr_value']},
+            },
+        },
+        'data_items': {
+            'selector': SELECTORS['data_item'],
+            'all': True,
+            'fields': {
+                'text': {},
+                'value': {'selector': SELECTORS['data_item_value']},
+            },
+        },
+        'submitter_block': {
+            'selector': SELECTORS['info_wrapper'],
+            'fields': {
+                'submitter': {'selector': SELECTORS['submitter']},
+                'details': {'selector': SELECTORS['member_detail'], 'all': True},
+            },
+        },
+        'next_data': {'selector': SELECTORS['next_data'], 'html': True},
+    },
+}
+
+# Runs inside the page: walks a spec and returns plain JSON in a single round-trip
+EXTRACT_JS = """
+(spec) => {
+    const value = (el, spec) => {
+        if (spec.fields) {
+            const out = {};
+            for (const [key, child] of Object.entries(spec.fields)) out[key] = extract(el, child);
+            return out;
+        }
+        if (spec.attr) return el.getAttribute(spec.attr);
+        if (spec.html) return el.innerHTML;
+        return el.innerText;
+    };
+    const extract = (root, spec) => {
+        if (spec.all) {
+            return Array.from(spec.selector ? root.querySelectorAll(spec.selector) : [root]).map(el => value(el, spec));
+        }
+        const el = spec.selector ? root.querySelector(spec.selector) : root;
+        return el ? value(el, spec) : null;
+    };
+    return extract(document, spec);
+}
+"""
+
+
+# Sends one evaluate() per listing page or detail page instead of one CDP call per field
+class ExtractionEngine:
+    def __init__(self, listing_spec=LISTING_PAGE_SPEC, detail_spec=DETAIL_PAGE_SPEC):
+        self.listing_spec = listing_spec
+        self.detail_spec = detail_spec
+        self.evaluate_calls = 0  # Round-trips made by the engine
+
+    async def extract(self, page, spec):
+        """Evaluate a spec in the page and return the raw JSON result."""
+        self.evaluate_calls += 1
+        with metrics.timer("evaluate"):
+            return await page.evaluate(EXTRACT_JS, spec)
+
+    async def extract_listing(self, page):
+        """Return the raw fields of every card on a listing page, plus its __NEXT_DATA__."""
+        return await self.extract(page, self.listing_spec) or {}
+
+    async def extract_details(self, page):
+        """Return the raw fields of a detail page."""
+        return await self.extract(page, self.detail_spec) or {}
@@ -0,0 +1,167 @@
+import asyncio
+import httpx
+import random
+import time
+from contextlib import asynccontextmanager
+from urllib.parse import urlparse
+
+# Status codes that mean "slow down": the host is rate limiting or overloaded
+THROTTLE_STATUSES = {429, 500, 502, 503, 504}
+
+
+# Raised by fetchers that do not raise on HTTP errors themselves (Playwright navigations)
+class FetchStatusError(Exception):
+    def __init__(self, url, status, retry_after=None):
+        super().__init__(f"HTTP {status} for {url}")
+        self.url = url
+        self.status = status
+        self.retry_after = retry_after  # Seconds from the Retry-After header, when given
+
+
+def backoff_delay(attempt, base=1.0, maximum=60.0):
+    """Exponential backoff with full jitter for the given (0-based) attempt, at most maximum seconds."""
+    return random.uniform(0, min(maximum, base * 2 ** attempt))
+
+
+def is_transient(error):
+    """True for 429/5xx answers, timeouts and dropped connections: retry the same request after a backoff.
+
+    Transport errors (refused, reset or malformed connections) are retried too, but only 429/5xx and
+    timeouts are throttle signals that cut the host's rate.
+    """
+    return FetchLimiter._classify(error)[0] is not None or isinstance(error, httpx.TransportError)
+
+
+# Token bucket of one host; its refill rate is tuned from the host's responses
+class HostBucket:
+    def __init__(self, rate, burst):
+        self.rate = rate  # Requests per second currently allowed
+        self.burst = burst  # Max tokens saved up while the host is idle
+        self.tokens = burst
+        self.updated = time.monotonic()
+        self.blocked_until = 0  # Monotonic time before which no request may start (backoff)
+        self.failures = 0  # Consecutive throttled/timed-out requests
+        self.latency = None  # Moving average of request latency (seconds)
+        self.lock = asyncio.Lock()  # Serializes waiters so tokens are handed out in order
+
+    def refill(self, now):
+        self.tokens = min(self.burst, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+
+
+# Global concurrency cap plus an adaptive per-host token bucket, shared by every category of a run.
+# Rate grows additively while requests succeed quickly and is cut multiplicatively, with a jittered
+# pause, on 429/5xx responses and timeouts (AIMD).
+class FetchLimiter:
+    def __init__(self, max_concurrent=4, per_host_interval=0.25, min_rate=0.2, max_rate=10.0, burst=2,
+                 increase_step=0.1, decrease_factor=0.5, slow_latency=10.0, base_backoff=1.0, max_backoff=60.0):
+        self.max_concurrent = max_concurrent  # Max fetches in flight across all categories
+        self.initial_rate = 1 / per_host_interval if per_host_interval else max_rate  # Starting requests/second per host
+        self.min_rate = min_rate  # Rate floor after repeated backoffs
+        self.max_rate = max_rate  # Rate ceiling while the host stays healthy
+        self.burst = burst  # Requests a host may receive back to back after being idle
+        self.increase_step = increase_step  # Requests/second added after each healthy response
+        self.decrease_factor = decrease_factor  # Rate multiplier on a throttle signal
+        self.slow_latency = slow_latency  # Seconds above which a successful request still counts as a slow-down signal
+        self.base_backoff = base_backoff  # First backoff pause (seconds), doubled per consecutive failure
+        self.max_backoff = max_backoff  # Upper bound for one backoff pause
+        self.fetch_count = 0  # Total fetches that went through the limiter
+        self.throttle_count = 0  # Fetches answered with 429/5xx or timed out
+        self.backoff_seconds = 0  # Total backoff pauses imposed on hosts
+        self._semaphore = asyncio.Semaphore(max_concurrent)
+        self._buckets = {}  # host -> HostBucket
+
+    @asynccontextmanager
+    async def slot(self, url):
+        """Hold a global slot and a token of url's host; the outcome of the block tunes the host's rate."""
+        bucket = self._bucket(urlparse(url).netloc)
+        async with self._semaphore:
+            await self._acquire(bucket)
+            self.fetch_count += 1
+            started = time.monotonic()
+            try:
+                yield
+            except Exception as e:
+                status, retry_after = self._classify(e)
+                if status is not None:
+                    self._on_throttle(bucket, retry_after)
+                raise
+            self._on_success(bucket, time.monotonic() - started)
+
+    @staticmethod
+    @asynccontextmanager
+    async def optional_slot(limiter, url):
+        """limiter.slot(url), or no limit at all when limiter is None (standalone use)."""
+        if limiter is None:
+            yield
+        else:
+            async with limiter.slot(url):
+                yield
+
+    def backoff_delay(self, attempt):
+        """Backoff pause before the given (0-based) attempt, with this limiter's bounds."""
+        return backoff_delay(attempt, self.base_backoff, self.max_backoff)
+
+    def stats(self):
+        """Return fetch/throttle counters and the current rate of every host."""
+        return {
+            'fetch_count': self.fetch_count,
+            'throttle_count': self.throttle_count,
+            'backoff_seconds': round(self.backoff_seconds, 1),
+            'host_rates': {host: round(bucket.rate, 2) for host, bucket in self._buckets.items()},
+        }
+
+    def _bucket(self, host):
+        if host not in self._buckets:
+            self._buckets[host] = HostBucket(self.initial_rate, self.burst)
+        return self._buckets[host]
+
+    async def _acquire(self, bucket):
+        async with bucket.lock:
+            while True:
+                now = time.monotonic()
+                if now < bucket.blocked_until:
+                    await asyncio.sleep(bucket.blocked_until - now)
+                    continue
+                bucket.refill(now)
+                if bucket.tokens >= 1:
+                    bucket.tokens -= 1
+                    return
+                await asyncio.sleep((1 - bucket.tokens) / bucket.rate)
+
+    @staticmethod
+    def _classify(error):
+        # (status, retry_after) for throttle signals, (None, None) for errors that say nothing about load
+        status = getattr(error, 'status', None)
+        retry_after = getattr(error, 'retry_after', None)
+        response = getattr(error, 'response', None)
+        if status is None and response is not None:
+            status = getattr(response, 'status_code', None)
+            try:
+                retry_after = float(response.headers.get('retry-after'))
+            except (TypeError, ValueError, AttributeError):
+                retry_after = None
+        if status in THROTTLE_STATUSES:
+            return status, retry_after
+        if isinstance(error, asyncio.TimeoutError) or 'Timeout' in type(error).__name__:
+            return 'timeout', None
+        return None, None
+
+    def _on_success(self, bucket, latency):
+        bucket.failures = 0
+        bucket.latency = latency if bucket.latency is None else 0.8 * bucket.latency + 0.2 * latency
+        if bucket.latency <= self.slow_latency:
+            bucket.rate = min(self.max_rate, bucket.rate + self.increase_step)
+        else:
+            bucket.rate = max(self.min_rate, bucket.rate * 0.9)  # Gentle cut: slow, but still answering
+
+    def _on_throttle(self, bucket, retry_after):
+        self.throttle_count += 1
+        bucket.rate = max(self.min_rate, bucket.rate * self.decrease_factor)
+        delay = retry_after if retry_after is not None else self.backoff_delay(bucket.failures)
+        bucket.failures += 1
+        bucket.tokens = 0
+        blocked_until = time.monotonic() + min(delay, self.max_backoff)
+        if blocked_until > bucket.blocked_until:
+            self.backoff_seconds += blocked_until - max(bucket.blocked_until, time.monotonic())
+            bucket.blocked_until = blocked_until
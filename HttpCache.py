@@ -0,0 +1,164 @@
+import hashlib
+import json
+import sqlite3
+import time
+import zlib
+
+
+# A fetched page: its body, the hash of the body and whether it is the same as the cached copy
+class CachedPage:
+    def __init__(self, url, content, content_hash, unchanged=False, not_modified=False):
+        self.url = url
+        self.content = content  # Raw body (bytes)
+        self.content_hash = content_hash  # sha256 of the body
+        self.unchanged = unchanged  # Same body as the cached copy (304, or 200 with an identical body)
+        self.not_modified = not_modified  # The server answered 304 and no body was downloaded
+
+    @property
+    def text(self):
+        return self.content.decode('utf-8', errors='replace')
+
+
+# On-disk cache of listing pages for conditional requests: ETag/Last-Modified, a content hash, the
+# compressed body and whatever the scraper parsed from that body, with LRU eviction past max_bytes
+class HttpCache:
+    def __init__(self, path="http_cache.sqlite3", max_bytes=64 * 1024 * 1024, commit_every=50):
+        self.path = path  # SQLite file kept between runs
+        self.max_bytes = max_bytes  # Stored bodies + parsed results above this are evicted, least recently used first
+        self.commit_every = commit_every  # Writes batched per commit
+        self.not_modified = 0  # 304 answers (no body downloaded)
+        self.unchanged = 0  # 200 answers with the cached body
+        self.stored = 0  # New or changed bodies stored
+        self.parsed_hits = 0  # Parses skipped thanks to a stored result
+        self.evicted = 0
+        self.total_bytes = 0
+        self._pending = 0
+        self._conn = None
+
+    def __enter__(self):
+        self.open()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+
+    def open(self):
+        """Open the cache and evict down to max_bytes."""
+        self._conn = sqlite3.connect(self.path)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS pages ("
+            "url TEXT PRIMARY KEY, etag TEXT, last_modified TEXT, content_hash TEXT NOT NULL, "
+            "body BLOB NOT NULL, parsed TEXT, size INTEGER NOT NULL, last_used REAL NOT NULL)"
+        )
+        self._conn.execute("CREATE INDEX IF NOT EXISTS pages_last_used ON pages (last_used)")
+        self.total_bytes = self._conn.execute("SELECT COALESCE(SUM(size), 0) FROM pages").fetchone()[0]
+        self._evict()
+        self._conn.commit()
+
+    def close(self):
+        """Commit pending writes and close the cache."""
+        if self._conn is not None:
+            self._conn.commit()
+            self._conn.close()
+            self._conn = None
+
+    def validators(self, url):
+        """Conditional request headers for url (If-None-Match / If-Modified-Since), empty when not cached."""
+        row = self._conn.execute("SELECT etag, last_modified FROM pages WHERE url = ?", (url,)).fetchone()
+        headers = {}
+        if row and row[0]:
+            headers['If-None-Match'] = row[0]
+        if row and row[1]:
+            headers['If-Modified-Since'] = row[1]
+        return headers
+
+    def not_modified_page(self, url):
+        """The cached copy of url after a 304 answer, or None when it was evicted meanwhile."""
+        row = self._conn.execute("SELECT body, content_hash FROM pages WHERE url = ?", (url,)).fetchone()
+        if row is None:
+            return None
+        self._touch(url)
+        self.not_modified += 1
+        return CachedPage(url, zlib.decompress(row[0]), row[1], unchanged=True, not_modified=True)
+
+    def store(self, url, content, etag=None, last_modified=None):
+        """Store a downloaded body; returns it as a CachedPage that tells whether it changed."""
+        content_hash = hashlib.sha256(content).hexdigest()
+        row = self._conn.execute("SELECT content_hash FROM pages WHERE url = ?", (url,)).fetchone()
+        if row is not None and row[0] == content_hash:
+            # Same body: keep the parsed result, only refresh the validators
+            self._write("UPDATE pages SET etag = ?, last_modified = ?, last_used = ? WHERE url = ?",
+                        (etag, last_modified, time.time(), url))
+            self.unchanged += 1
+            return CachedPage(url, content, content_hash, unchanged=True)
+
+        body = zlib.compress(content)
+        self._replace(url, etag, last_modified, content_hash, body, None)
+        self.stored += 1
+        return CachedPage(url, content, content_hash)
+
+    def parsed(self, page):
+        """The result stored for page's body by set_parsed, or None."""
+        if not page.unchanged:
+            return None
+        row = self._conn.execute(
+            "SELECT parsed FROM pages WHERE url = ? AND content_hash = ?", (page.url, page.content_hash)
+        ).fetchone()
+        if row is None or row[0] is None:
+            return None
+        self.parsed_hits += 1
+        return json.loads(row[0])
+
+    def set_parsed(self, page, parsed):
+        """Store what was parsed from page's body (JSON-serializable), reused while the body stays the same."""
+        row = self._conn.execute(
+            "SELECT etag, last_modified, body FROM pages WHERE url = ? AND content_hash = ?", (page.url, page.content_hash)
+        ).fetchone()
+        if row is not None:
+            self._replace(page.url, row[0], row[1], page.content_hash, row[2], json.dumps(parsed, ensure_ascii=False))
+
+    def stats(self):
+        """Return hit and size counters for the run."""
+        return {
+            'not_modified': self.not_modified,
+            'unchanged': self.unchanged,
+            'stored': self.stored,
+            'parsed_hits': self.parsed_hits,
+            'evicted': self.evicted,
+            'size_bytes': self.total_bytes,
+        }
+
+    def _replace(self, url, etag, last_modified, content_hash, body, parsed):
+        size = len(body) + len(parsed or '')
+        old = self._conn.execute("SELECT size FROM pages WHERE url = ?", (url,)).fetchone()
+        self._write(
+            "INSERT OR REPLACE INTO pages (url, etag, last_modified, content_hash, body, parsed, size, last_used) "
+            "VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+            (url, etag, last_modified, content_hash, body, parsed, size, time.time()),
+        )
+        self.total_bytes += size - (old[0] if old else 0)
+        if self.total_bytes > self.max_bytes:
+            self._evict()
+
+    def _touch(self, url):
+        self._write("UPDATE pages SET last_used = ? WHERE url = ?", (time.time(), url))
+
+    def _evict(self):
+        # Drop least recently used pages until the cache is back to 90% of max_bytes
+        target = self.max_bytes * 0.9
+        if self.total_bytes <= self.max_bytes:
+            return
+        for url, size in self._conn.execute("SELECT url, size FROM pages ORDER BY last_used").fetchall():
+            if self.total_bytes <= target:
+                break
+            self._conn.execute("DELETE FROM pages WHERE url = ?", (url,))
+            self.total_bytes -= size
+            self.evicted += 1
+
+    def _write(self, sql, params):
+        self._conn.execute(sql, params)
+        self._pending += 1
+        if self._pending >= self.commit_every:
+            self._conn.commit()
+            self._pending = 0
@@ -0,0 +1,88 @@
+import hashlib
+import httpx
+from HttpCache import CachedPage
+from RunMetrics import metrics
+
+# Browser-like headers so the server renders the same HTML it sends to Chromium
+DEFAULT_HEADERS = {
+    'User-Agent': (
+        'Mozilla/5.0 (X11; Linux x86_64) AppleWebKit/537.36 '
+        '(KHTML, like Gecko) Chrome/131.0.0.0 Safari/537.36'
+    ),
+    'Accept': 'text/html,application/xhtml+xml,application/xml;q=0.9,*/*;q=0.8',
+    'Accept-Language': 'ar,en;q=0.8',
+}
+
+
+# Pooled async HTTP client (keep-alive + HTTP/2) shared by every category of a run
+class HttpFetcher:
+    def __init__(self, max_connections=10, timeout=30, http2=True, headers=None, cache=None):
+        self.max_connections = max_connections  # Connections kept open to the site
+        self.timeout = timeout  # Seconds per request
+        self.http2 = http2  # Negotiate HTTP/2 when the server supports it
+        self.headers = headers or DEFAULT_HEADERS
+        self.cache = cache  # HttpCache for conditional requests of listing pages, optional
+        self.fetch_count = 0  # Requests sent
+        self.bytes_received = 0  # Response body bytes received
+        self._client = None
+
+    async def __aenter__(self):
+        await self.start()
+        return self
+
+    async def __aexit__(self, exc_type, exc, tb):
+        await self.close()
+
+    async def start(self):
+        """Open the pooled client."""
+        if self._client is None:
+            self._client = httpx.AsyncClient(
+                http2=self.http2,
+                headers=self.headers,
+                timeout=self.timeout,
+                follow_redirects=True,
+                limits=httpx.Limits(
+                    max_connections=self.max_connections,
+                    max_keepalive_connections=self.max_connections,
+                ),
+            )
+
+    async def close(self):
+        """Close the pooled client and its connections."""
+        if self._client is not None:
+            await self._client.aclose()
+            self._client = None
+
+    async def fetch_text(self, url):
+        """GET url and return the decoded body; raises on HTTP errors."""
+        return (await self._get(url)).text
+
+    async def fetch_page(self, url, headers=None, use_cache=True):
+        """GET url as a CachedPage; with a cache, sends a conditional request and reports whether the body changed."""
+        if self.cache is None or not use_cache:
+            response = await self._get(url, headers)
+            return CachedPage(url, response.content, hashlib.sha256(response.content).hexdigest())
+
+        response = await self._get(url, {**(headers or {}), **self.cache.validators(url)}, allow_not_modified=True)
+        if response.status_code == 304:
+            page = self.cache.not_modified_page(url)
+            if page is not None:
+                return page
+            response = await self._get(url, headers)  # Evicted since the request was sent: fetch it in full
+        return self.cache.store(url, response.content, response.headers.get('etag'), response.headers.get('last-modified'))
+
+    def stats(self):
+        """Return request and byte counters for the run."""
+        return {'fetch_count': self.fetch_count, 'bytes_received': self.bytes_received}
+
+    async def _get(self, url, headers=None, allow_not_modified=False):
+        if self._client is None:
+            await self.start()
+        with metrics.timer("http_fetch"):
+            response = await self._client.get(url, headers=headers)
+        self.fetch_count += 1
+        self.bytes_received += len(response.content)
+        metrics.add_bytes("http_fetch", len(response.content))
+        if not (allow_not_modified and response.status_code == 304):
+            response.raise_for_status()
+        return response
@@ -0,0 +1,55 @@
+import threading
+from functools import partial
+from http.server import SimpleHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+
+
+# Request handler that maps site paths to saved pages (/ar/gifts/watches/1 -> ar/gifts/watches/1.html)
+class SavedPageHandler(SimpleHTTPRequestHandler):
+    def translate_path(self, path):
+        local_path = Path(super().translate_path(path))
+        if local_path.is_dir():
+            return str(local_path / 'index.html')
+        if not local_path.exists() and local_path.with_suffix(local_path.suffix + '.html').exists():
+            return str(local_path.with_suffix(local_path.suffix + '.html'))
+        return str(local_path)
+
+    def log_message(self, format, *args):
+        pass  # Keep test and benchmark output quiet
+
+
+# Local stand-in for q84sale.com that serves saved HTML pages from a directory
+class LocalSiteServer:
+    def __init__(self, root_dir, host='127.0.0.1', port=0):
+        self.root_dir = Path(root_dir)  # Directory holding the saved pages
+        self.host = host
+        self.port = port  # 0 picks a free port
+        self._server = None
+        self._thread = None
+
+    def __enter__(self):
+        self.start()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.stop()
+
+    @property
+    def base_url(self):
+        """Origin to use instead of https://www.q84sale.com."""
+        return f"http://{self.host}:{self.port}"
+
+    def start(self):
+        """Serve root_dir from a background thread."""
+        handler = partial(SavedPageHandler, directory=str(self.root_dir))
+        self._server = ThreadingHTTPServer((self.host, self.port), handler)
+        self.port = self._server.server_address[1]
+        self._thread = threading.Thread(target=self._server.serve_forever, daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        """Shut the server down."""
+        if self._server is not None:
+            self._server.shutdown()
+            self._server.server_close()
+            self._server = None
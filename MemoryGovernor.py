@@ -0,0 +1,192 @@
+import asyncio
+import gc
+import os
+import resource
+import sys
+import time
+import tracemalloc
+
+try:  # Optional: exact per-process RSS on every platform; /proc is read on Linux without it
+    import psutil
+except ImportError:
+    psutil = None
+
+MB = 1024 * 1024
+
+
+# Watches the Python process and the browsers it spawned over a long run. Crossing the browser
+# threshold retires the current Chromium (its contexts drain, then it closes); crossing the Python
+# threshold forces a GC and, with heap tracing on, logs the allocation sites that grew the most.
+class MemoryGovernor:
+    def __init__(self, browser_pool=None, logger=None, browser_rss_limit_mb=2500, python_rss_limit_mb=1500,
+                 check_interval=5.0, log_every=50, trace_heap=False, recycle_cooldown=60.0):
+        self.browser_pool = browser_pool  # BrowserPool recycled when browser memory crosses its limit
+        self.logger = logger
+        self.browser_rss_limit_mb = browser_rss_limit_mb  # RSS of every child process (driver + Chromium) before recycling
+        self.python_rss_limit_mb = python_rss_limit_mb  # RSS of this process before a forced GC and a leak report
+        self.check_interval = check_interval  # Min seconds between two measurements
+        self.log_every = log_every  # Log a memory line every this many processed ads
+        self.trace_heap = trace_heap  # Trace Python allocations with tracemalloc (slower, finds leaks)
+        self.recycle_cooldown = recycle_cooldown  # Min seconds between two memory recycles (retired browsers drain first)
+        self.ads_processed = 0
+        self.checks = 0
+        self.browser_recycles = 0  # Browsers retired because of memory
+        self.forced_collections = 0  # gc.collect() calls forced by the Python limit
+        self.last_sample = {}
+        self.peak = {}  # Highest value seen per measurement
+        self._first_sample = None
+        self._last_recycle = float('-inf')
+        self._python_alarm_mb = python_rss_limit_mb  # Raised after each forced GC so a plateau is reported once
+        self._last_check = 0
+        self._baseline_snapshot = None
+
+    def start(self):
+        """Take the baseline measurement (and heap snapshot when tracing)."""
+        if self.trace_heap:
+            if not tracemalloc.is_tracing():
+                tracemalloc.start(10)
+            self._baseline_snapshot = tracemalloc.take_snapshot()
+        self._first_sample = self._record(self.measure())
+
+    def stop(self):
+        """Stop heap tracing if this governor started it."""
+        if self.trace_heap and tracemalloc.is_tracing():
+            tracemalloc.stop()
+        self._baseline_snapshot = None
+
+    def measure(self):
+        """Return the current memory usage in MB: this process, its browsers and the traced Python heap."""
+        sample = {'python_rss_mb': _round_mb(_own_rss())}
+        browser_rss = _children_rss()
+        if browser_rss is not None:
+            sample['browser_rss_mb'] = _round_mb(browser_rss)
+        if tracemalloc.is_tracing():
+            sample['heap_mb'] = _round_mb(tracemalloc.get_traced_memory()[0])
+        if self.browser_pool is not None:
+            sample['open_contexts'] = self.browser_pool.open_contexts
+        return sample
+
+    async def after_ad(self):
+        """Count a processed ad; measure, log and enforce the limits when the check interval elapsed."""
+        self.ads_processed += 1
+        now = time.monotonic()
+        if now - self._last_check < self.check_interval and self.ads_processed % self.log_every:
+            return
+        self._last_check = now
+        sample = self._record(await asyncio.to_thread(self.measure))
+        if self.ads_processed % self.log_every == 0:
+            self._log(f"Memory after {self.ads_processed} ads: {sample} ({self.growth_per_ad()} MB/ad)")
+        await self.enforce(sample)
+
+    async def enforce(self, sample):
+        """Recycle the browser or collect garbage when a limit is crossed."""
+        browser_rss = sample.get('browser_rss_mb')
+        if (browser_rss is not None and browser_rss > self.browser_rss_limit_mb and self.browser_pool is not None
+                and time.monotonic() - self._last_recycle >= self.recycle_cooldown):
+            if await self.browser_pool.recycle():
+                self._last_recycle = time.monotonic()
+                self.browser_recycles += 1
+                self._log(f"Browser memory {browser_rss} MB over {self.browser_rss_limit_mb} MB, recycling Chromium")
+        if sample['python_rss_mb'] > self._python_alarm_mb:
+            self._python_alarm_mb = sample['python_rss_mb'] * 1.1
+            self.forced_collections += 1
+            freed = gc.collect()
+            self._log(f"Python memory {sample['python_rss_mb']} MB over {self.python_rss_limit_mb} MB, collected {freed} objects")
+            self.log_heap_growth()
+        if self.browser_pool is not None and sample.get('open_contexts', 0) > self.browser_pool.pool_size:
+            self._log(f"{sample['open_contexts']} browser contexts open for a pool of {self.browser_pool.pool_size}: contexts are leaking")
+
+    def log_heap_growth(self, limit=10):
+        """Log the allocation sites that grew the most since start (needs trace_heap)."""
+        if self._baseline_snapshot is None or not tracemalloc.is_tracing():
+            return
+        snapshot = tracemalloc.take_snapshot().filter_traces((
+            tracemalloc.Filter(False, tracemalloc.__file__),
+            tracemalloc.Filter(False, "<frozen importlib._bootstrap>"),
+        ))
+        for stat in snapshot.compare_to(self._baseline_snapshot, 'lineno')[:limit]:
+            self._log(f"Heap growth: {stat}")
+
+    def growth_per_ad(self):
+        """Python + browser RSS growth since start, divided by the ads processed."""
+        if not self._first_sample or not self.ads_processed:
+            return None
+        total = lambda sample: sample.get('python_rss_mb', 0) + sample.get('browser_rss_mb', 0)
+        return round((total(self.last_sample) - total(self._first_sample)) / self.ads_processed, 3)
+
+    def stats(self):
+        """Return peak usage and the actions taken during the run."""
+        return {
+            'ads_processed': self.ads_processed,
+            'checks': self.checks,
+            'last': self.last_sample,
+            'peak': self.peak,
+            'growth_mb_per_ad': self.growth_per_ad(),
+            'browser_recycles': self.browser_recycles,
+            'forced_collections': self.forced_collections,
+            'source': 'psutil' if psutil is not None else 'procfs' if os.path.isdir('/proc') else 'resource',
+        }
+
+    def _record(self, sample):
+        self.checks += 1
+        self.last_sample = sample
+        for key, value in sample.items():
+            self.peak[key] = max(self.peak.get(key, value), value)
+        return sample
+
+    def _log(self, message):
+        if self.logger is not None:
+            self.logger.info(message)
+        else:
+            print(message)
+
+
+def _round_mb(nbytes):
+    return round(nbytes / MB, 1)
+
+
+def _own_rss():
+    # Current RSS of this process in bytes; falls back to the peak RSS where nothing better exists
+    if psutil is not None:
+        return psutil.Process().memory_info().rss
+    try:
+        with open('/proc/self/statm') as f:
+            return int(f.read().split()[1]) * os.sysconf('SC_PAGE_SIZE')
+    except (OSError, ValueError, IndexError):
+        peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        return peak if sys.platform == 'darwin' else peak * 1024  # bytes on macOS, KB on Linux
+
+
+def _children_rss():
+    # Summed RSS (bytes) of every process descending from this one: the Playwright driver and Chromium
+    if psutil is not None:
+        total = 0
+        for child in psutil.Process().children(recursive=True):
+            try:
+                total += child.memory_info().rss
+            except (psutil.NoSuchProcess, psutil.AccessDenied):
+                pass
+        return total
+    if not os.path.isdir('/proc'):
+        return None
+    children = {}
+    for entry in os.listdir('/proc'):
+        if entry.isdigit():
+            try:
+                with open(f'/proc/{entry}/stat') as f:
+                    ppid = int(f.read().rsplit(')', 1)[1].split()[1])  # comm may contain spaces
+            except (OSError, ValueError, IndexError):
+                continue
+            children.setdefault(ppid, []).append(int(entry))
+    total = 0
+    pending = list(children.get(os.getpid(), ()))
+    page_size = os.sysconf('SC_PAGE_SIZE')
+    while pending:
+        pid = pending.pop()
+        pending.extend(children.get(pid, ()))
+        try:
+            with open(f'/proc/{pid}/statm') as f:
+                total += int(f.read().split()[1]) * page_size
+        except (OSError, ValueError, IndexError):
+            pass
+    return total
@@ -0,0 +1,266 @@
+import json
+import math
+import re
+from datetime import datetime
+from urllib.parse import urljoin
+
+# Key paths tried, in order, for each field of the scrape_more_details output.
+# Each path walks the `props.pageProps.listing` record; ints index into lists.
+LISTING_FIELD_PATHS = {
+    'id': [('id',), ('listing_id',), ('ad_id',)],
+    'description': [('description',), ('desc',)],
+    'image': [('image',), ('main_image',), ('images', 0, 'url'), ('images', 0)],
+    'price': [('price',)],
+    'address': [('address',), ('district', 'name'), ('district_name',)],
+    'additional_details': [('bool_attrs',), ('boolean_attributes',)],
+    'specifications': [('attrs',), ('attributes',)],
+    'views_no': [('views',), ('views_count',), ('view_count',)],
+    'submitter': [('user', 'name'), ('user_name',), ('user', 'display_name')],
+    'ads': [('user', 'listings_count'), ('user', 'ads_count')],
+    'membership': [('user', 'member_since')],
+    'phone': [('phone',), ('user', 'phone')],
+    'date_published': [('date_published',), ('published_at',), ('created_at',)],
+}
+
+NEXT_DATA_SCRIPT_PATTERN = re.compile(
+    r'<script[^>]*id=["\']__NEXT_DATA__["\'][^>]*>(.*?)</script>', re.DOTALL
+)
+
+
+# Parse the __NEXT_DATA__ payload from a script body or a full HTML document
+def parse_next_data(content):
+    if not content:
+        return None
+    match = NEXT_DATA_SCRIPT_PATTERN.search(content)
+    if match:
+        content = match.group(1)
+    try:
+        return json.loads(content.strip())
+    except ValueError:
+        return None
+
+
+# Return the listing record of a detail page payload, or None
+def get_listing(data):
+    if not isinstance(data, dict):
+        return None
+    listing = data.get("props", {}).get("pageProps", {}).get("listing")
+    return listing if isinstance(listing, dict) else None
+
+
+def _walk(record, path):
+    value = record
+    for key in path:
+        if isinstance(key, int):
+            if not isinstance(value, list) or len(value) <= key:
+                return None
+        elif not isinstance(value, dict):
+            return None
+        value = value[key] if isinstance(key, int) else value.get(key)
+        if value is None:
+            return None
+    return value
+
+
+def _lookup(record, field, field_paths=LISTING_FIELD_PATHS):
+    for path in field_paths[field]:
+        value = _walk(record, path)
+        if value not in (None, '', [], {}):
+            return value
+    return None
+
+
+# Convert a JSON timestamp (epoch seconds/ms or ISO string) to the scraper's date format
+def format_timestamp(value):
+    try:
+        if isinstance(value, (int, float)):
+            published = datetime.fromtimestamp(value / 1000 if value > 1e12 else value)
+        else:
+            published = datetime.fromisoformat(str(value).replace('Z', '+00:00'))
+            if published.tzinfo is not None:
+                published = published.astimezone().replace(tzinfo=None)
+        return published.strftime("%Y-%m-%d %H:%M:%S")
+    except (ValueError, TypeError, OverflowError, OSError):
+        return None
+
+
+# Express a published date as the relative text shown on the site (e.g. "منذ 5 ساعة")
+def relative_from_published(date_published, now=None):
+    published = datetime.strptime(date_published, "%Y-%m-%d %H:%M:%S")
+    seconds = max(int(((now or datetime.now()) - published).total_seconds()), 0)
+    for unit, size in (('شهر', 30 * 86400), ('يوم', 86400), ('ساعة', 3600), ('دقيقة', 60)):
+        if seconds >= size:
+            return f"منذ {seconds // size} {unit}"
+    return f"منذ {seconds} ثانية"
+
+
+def _format_specifications(value):
+    if isinstance(value, dict):
+        return {str(k): str(v).strip() for k, v in value.items() if v not in (None, '')}
+    if isinstance(value, list):
+        specifications = {}
+        for attr in value:
+            if isinstance(attr, dict):
+                name = attr.get('name') or attr.get('label') or attr.get('title')
+                attr_value = attr.get('value') or attr.get('value_label')
+                if name and attr_value not in (None, ''):
+                    specifications[str(name)] = str(attr_value).strip()
+        return specifications or None
+    return None
+
+
+def _format_additional_details(value):
+    if not isinstance(value, list):
+        return None
+    values = []
+    for attr in value:
+        if isinstance(attr, dict):
+            attr = attr.get('name') or attr.get('label') or attr.get('title')
+        if attr and str(attr).strip():
+            values.append(str(attr).strip())
+    return values or None
+
+
+# Map a listing record to the scrape_more_details fields it can serve; missing fields are omitted
+def map_listing(listing):
+    details = {}
+    if not listing:
+        return details
+
+    for field in ('description', 'address', 'submitter', 'phone'):
+        value = _lookup(listing, field)
+        if isinstance(value, (str, int)):
+            details[field] = str(value).strip()
+
+    ad_id = _lookup(listing, 'id')
+    if isinstance(ad_id, (str, int)):
+        details['id'] = str(ad_id)
+
+    image = _lookup(listing, 'image')
+    if isinstance(image, str):
+        details['image'] = image
+
+    price = _lookup(listing, 'price')
+    if isinstance(price, (int, float)):
+        details['price'] = f"{price:g} KWD"
+    elif isinstance(price, str) and price.strip():
+        details['price'] = price.strip()
+
+    views = _lookup(listing, 'views_no')
+    if isinstance(views, (int, str)):
+        details['views_no'] = str(views).strip()
+
+    ads = _lookup(listing, 'ads')
+    if isinstance(ads, int):
+        details['ads'] = f"{ads} اعلان"
+
+    membership = _lookup(listing, 'membership')
+    if isinstance(membership, str) and membership.strip():
+        details['membership'] = membership.strip()
+
+    specifications = _format_specifications(_lookup(listing, 'specifications'))
+    if specifications is not None:
+        details['specifications'] = specifications
+
+    additional_details = _format_additional_details(_lookup(listing, 'additional_details'))
+    if additional_details is not None:
+        details['additional_details'] = additional_details
+
+    published = _lookup(listing, 'date_published')
+    date_published = format_timestamp(published) if published is not None else None
+    if date_published:
+        details['date_published'] = date_published
+        details['relative_date'] = relative_from_published(date_published)
+
+    return details
+
+
+# Paths to the card records embedded in a listing page payload
+LISTING_CARDS_PATHS = [
+    ('props', 'pageProps', 'listings'),
+    ('props', 'pageProps', 'data', 'listings'),
+    ('props', 'pageProps', 'ads'),
+]
+
+# Paths to the pagination metadata of a listing page payload
+PAGINATION_PATHS = [
+    ('props', 'pageProps', 'pagination'),
+    ('props', 'pageProps', 'data', 'pagination'),
+    ('props', 'pageProps', 'meta'),
+]
+
+# Key paths tried, in order, for the card-level fields of a listing page card record
+CARD_FIELD_PATHS = {
+    'link': [('url',), ('link',), ('share_url',), ('slug',)],
+    'title': [('title',), ('name',)],
+    'type': [('category', 'name'), ('category_name',), ('cat_name',)],
+    'pin': [('is_pinned',), ('pinned',), ('is_featured',), ('sticky',)],
+}
+
+AD_ID_IN_LINK_PATTERN = re.compile(r'(\d+)/?(?:[?#].*)?$')
+
+
+# Return the card records of a listing page payload
+def get_listing_cards(data):
+    for path in LISTING_CARDS_PATHS:
+        records = _walk(data, path)
+        if isinstance(records, list):
+            return [record for record in records if isinstance(record, dict)]
+    return []
+
+
+# Build the basic cards of a listing page payload (as the DOM path does); None when a record lacks its link or title
+def get_basic_cards(data, base_url):
+    records = get_listing_cards(data)
+    if not records:
+        return None
+    basic_cards = []
+    for record in records:
+        link = _lookup(record, 'link', CARD_FIELD_PATHS)
+        title = _lookup(record, 'title', CARD_FIELD_PATHS)
+        if not isinstance(link, str) or not isinstance(title, str):
+            return None
+        card_type = _lookup(record, 'type', CARD_FIELD_PATHS)
+        basic_cards.append({
+            'link': urljoin(base_url, link),
+            'type': str(card_type).strip() if isinstance(card_type, (str, int)) else None,
+            'title': title.strip(),
+            'pin': "Pinned today" if _lookup(record, 'pin', CARD_FIELD_PATHS) else "Not Pinned",
+        })
+    return basic_cards
+
+
+# Map ad id -> listing-level date_published/price/views_no for every card of a listing page payload
+def get_card_summaries(data):
+    summaries = {}
+    for record in get_listing_cards(data):
+        ad_id = _lookup(record, 'id')
+        if ad_id is None:
+            continue
+        details = map_listing(record)
+        summaries[str(ad_id)] = {
+            field: details.get(field) for field in ('date_published', 'price', 'views_no')
+        }
+    return summaries
+
+
+# Extract the numeric ad id at the end of an ad link
+def ad_id_from_link(link):
+    match = AD_ID_IN_LINK_PATTERN.search(link or '')
+    return match.group(1) if match else None
+
+
+# Return the number of pages in a category from a listing page payload, or None
+def get_page_count(data):
+    for path in PAGINATION_PATHS:
+        meta = _walk(data, path)
+        if not isinstance(meta, dict):
+            continue
+        for key in ('total_pages', 'totalPages', 'last_page', 'lastPage', 'pages'):
+            if isinstance(meta.get(key), int) and meta[key] > 0:
+                return meta[key]
+        total = meta.get('total', meta.get('count'))
+        per_page = meta.get('per_page', meta.get('perPage', meta.get('limit')))
+        if isinstance(total, int) and isinstance(per_page, int) and per_page > 0:
+            return max(math.ceil(total / per_page), 1)
+    return None
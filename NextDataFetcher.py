@@ -0,0 +1,100 @@
+import asyncio
+import json
+from urllib.parse import urlsplit, urlunsplit
+from FetchLimiter import FetchLimiter
+from NextData import parse_next_data
+
+# Headers of the JSON requests the Next.js router itself sends for client-side navigations
+DATA_ROUTE_HEADERS = {'Accept': 'application/json', 'x-nextjs-data': '1'}
+
+
+def is_not_found(error):
+    """True when error is an HTTP 404 answer."""
+    return getattr(getattr(error, 'response', None), 'status_code', None) == 404
+
+
+# Fetches the JSON behind Next.js pages (/_next/data/<buildId>/<path>.json) instead of their HTML.
+# The buildId is read from the first HTML page fetched. A data route answering 404 means either that
+# a deploy rotated the buildId or that the page itself is gone (deleted/expired ad): the page's HTML
+# tells which, since its __NEXT_DATA__ carries the live buildId and a gone page 404s there too.
+class NextDataFetcher:
+    def __init__(self, http_fetcher, fetch_limiter=None):
+        self.http_fetcher = http_fetcher  # Shared HttpFetcher (pooled client)
+        self.fetch_limiter = fetch_limiter  # Shared FetchLimiter, optional
+        self.build_id = None  # Current buildId of the site, discovered on the first fetch
+        self.data_route_fetches = 0  # Pages served by their JSON data route
+        self.html_fetches = 0  # Pages served from HTML (buildId discovery or rotation)
+        self.build_id_rotations = 0  # Times a data route 404 came from a new buildId in the page HTML
+        self.missing_pages = 0  # Data route 404s whose HTML 404'd too (the page is gone)
+        self._lock = asyncio.Lock()  # Only one discovery in flight when the run starts
+        self._retired_build_ids = set()  # buildIds already counted as rotated
+
+    def data_url(self, page_url):
+        """The data route of page_url for the current buildId, e.g. /ar/gifts/watches/2 -> /_next/data/<id>/ar/gifts/watches/2.json."""
+        parts = urlsplit(page_url)
+        path = parts.path.rstrip('/') or '/index'
+        return urlunsplit((parts.scheme, parts.netloc, f"/_next/data/{self.build_id}{path}.json", parts.query, ''))
+
+    async def fetch_page(self, page_url, use_cache=True):
+        """Fetch page_url's payload through the HTTP cache; returns (CachedPage, load_data), load_data() parses it into the __NEXT_DATA__ shape (None when notFound)."""
+        if self.build_id is None:
+            async with self._lock:
+                if self.build_id is None:
+                    return await self._fetch_html_page(page_url, use_cache)
+
+        build_id = self.build_id
+        try:
+            async with FetchLimiter.optional_slot(self.fetch_limiter, page_url):
+                page = await self.http_fetcher.fetch_page(self.data_url(page_url), headers=DATA_ROUTE_HEADERS, use_cache=use_cache)
+        except Exception as e:
+            if not is_not_found(e):
+                raise
+            return await self._recover_from_404(page_url, build_id, use_cache)
+
+        self.data_route_fetches += 1
+
+        def load_data():
+            payload = json.loads(page.content)
+            if not isinstance(payload, dict) or payload.get('notFound'):
+                return None
+            return {'buildId': build_id, 'props': payload}
+        return page, load_data
+
+    def note_build_id(self, data):
+        """Adopt the buildId of a __NEXT_DATA__ payload read elsewhere (e.g. by the HTML path)."""
+        if isinstance(data, dict) and isinstance(data.get('buildId'), str):
+            self.build_id = data['buildId']
+
+    def stats(self):
+        """Return data route and fallback counters for the run."""
+        return {
+            'build_id': self.build_id,
+            'data_route_fetches': self.data_route_fetches,
+            'html_fetches': self.html_fetches,
+            'build_id_rotations': self.build_id_rotations,
+            'missing_pages': self.missing_pages,
+        }
+
+    async def _recover_from_404(self, page_url, build_id, use_cache):
+        # The HTML decides: a 404 there too means the page is gone (raised, buildId kept); a different
+        # buildId in its __NEXT_DATA__ is a rotation, adopted by _fetch_html_page for the next requests
+        try:
+            page, load_data = await self._fetch_html_page(page_url, use_cache)
+        except Exception as e:
+            if is_not_found(e):
+                self.missing_pages += 1
+            raise
+        new_build_id = (load_data() or {}).get('buildId')
+        if new_build_id and new_build_id != build_id and build_id not in self._retired_build_ids:
+            self._retired_build_ids.add(build_id)  # Concurrent 404s of the old buildId count the rotation once
+            self.build_id_rotations += 1
+            print(f"buildId rotated from {build_id} to {new_build_id}, data routes use the new one")
+        return page, load_data
+
+    async def _fetch_html_page(self, page_url, use_cache):
+        async with FetchLimiter.optional_slot(self.fetch_limiter, page_url):
+            page = await self.http_fetcher.fetch_page(page_url, use_cache=use_cache)
+        self.html_fetches += 1
+        data = parse_next_data(page.text)  # Parsed right away: it carries the buildId
+        self.note_build_id(data)
+        return page, lambda: data
@@ -0,0 +1,105 @@
+import re
+import pandas as pd
+from RunMetrics import metrics
+
+# Precompiled once; applied to whole columns with the pandas string methods
+NUMBER_PATTERN = re.compile(r'(\d[\d,]*(?:\.\d+)?)')
+MEMBERSHIP_PATTERN = re.compile(r'(?:عضو منذ|member since)\s+(\D+?)\s+(\d{4})', re.IGNORECASE)
+RELATIVE_TIME_PATTERN = re.compile(r'(\d+)\s+(second|minute|hour|day|month|ثانية|دقيقة|ساعة|يوم|شهر)', re.IGNORECASE)
+
+# Arabic-Indic digits as shown on the Arabic site -> ASCII digits
+ARABIC_DIGITS = str.maketrans('٠١٢٣٤٥٦٧٨٩', '0123456789')
+
+MONTHS = {
+    'يناير': 1, 'فبراير': 2, 'مارس': 3, 'أبريل': 4, 'ابريل': 4, 'مايو': 5, 'يونيو': 6, 'يوليو': 7,
+    'أغسطس': 8, 'اغسطس': 8, 'سبتمبر': 9, 'أكتوبر': 10, 'اكتوبر': 10, 'نوفمبر': 11, 'ديسمبر': 12,
+    'january': 1, 'february': 2, 'march': 3, 'april': 4, 'may': 5, 'june': 6, 'july': 7,
+    'august': 8, 'september': 9, 'october': 10, 'november': 11, 'december': 12,
+}
+
+# Seconds per relative-time unit; months are calendar months and handled separately
+UNIT_SECONDS = {
+    'second': 1, 'ثانية': 1, 'minute': 60, 'دقيقة': 60, 'hour': 3600, 'ساعة': 3600, 'day': 86400, 'يوم': 86400,
+}
+MONTH_UNITS = ('month', 'شهر')
+
+MISSING_PRICE = "0 KWD"  # Written by the scraper when the price element is missing
+DATE_FORMAT = "%Y-%m-%d %H:%M:%S"
+
+# Typed columns appended after the scraped (string) columns
+TYPED_COLUMNS = ('price_kwd', 'views', 'ads_count', 'member_since', 'published_at')
+
+
+def _text(frame, column):
+    # Column as a string Series (missing column -> all missing), Arabic-Indic digits made ASCII
+    if column not in frame:
+        return pd.Series(pd.NA, index=frame.index, dtype='string')
+    return frame[column].astype('string').str.translate(ARABIC_DIGITS).str.strip()
+
+
+def _number(text):
+    return pd.to_numeric(text.str.extract(NUMBER_PATTERN, expand=False).str.replace(',', '', regex=False), errors='coerce')
+
+
+def parse_price(frame):
+    """'1,250 KWD' -> 1250.0; the missing-price fallback becomes NaN."""
+    text = _text(frame, 'price')
+    return _number(text.mask(text == MISSING_PRICE)).astype('float64')
+
+
+def parse_count(frame, column):
+    """'15 اعلان' / '1,204' -> 15 / 1204 as a nullable integer column."""
+    return _number(_text(frame, column)).round().astype('Int64')
+
+
+def parse_membership(frame):
+    """'عضو منذ يناير 2020' -> 2020-01-01 (NaT when the line is missing or unknown)."""
+    parts = _text(frame, 'membership').str.extract(MEMBERSHIP_PATTERN)
+    month = parts[0].str.strip().str.lower().map(MONTHS).astype('float64')
+    year = pd.to_numeric(parts[1], errors='coerce').astype('float64')
+    return pd.to_datetime(pd.DataFrame({'year': year, 'month': month, 'day': 1}), errors='coerce')
+
+
+def parse_published(frame):
+    """Absolute date_published when present, else relative_date counted back from the ad's fetched_at."""
+    published = pd.to_datetime(_text(frame, 'date_published'), format=DATE_FORMAT, errors='coerce')
+
+    fetched_at = pd.to_datetime(_text(frame, 'fetched_at'), format=DATE_FORMAT, errors='coerce')
+    relative = _text(frame, 'relative_date').str.extract(RELATIVE_TIME_PATTERN)
+    amount = pd.to_numeric(relative[0], errors='coerce')
+    unit = relative[1].str.lower()
+    anchored = fetched_at - pd.to_timedelta(amount * unit.map(UNIT_SECONDS).astype('float64'), unit='s')
+    # Calendar months: one vectorized offset per distinct month count (a handful per batch)
+    is_months = unit.isin(MONTH_UNITS).fillna(False).astype(bool) & amount.notna()
+    for months in amount[is_months].unique():
+        rows = is_months & (amount == months)
+        anchored[rows] = fetched_at[rows] - pd.DateOffset(months=int(months))
+
+    return published.fillna(anchored)
+
+
+def normalize_frame(frame):
+    """Return a copy of frame with the typed columns added."""
+    frame = frame.copy()
+    frame['price_kwd'] = parse_price(frame)
+    frame['views'] = parse_count(frame, 'views_no')
+    frame['ads_count'] = parse_count(frame, 'ads')
+    frame['member_since'] = parse_membership(frame)
+    frame['published_at'] = parse_published(frame)
+    return frame
+
+
+def normalize_records(rows):
+    """Add the typed columns to a batch of scraped rows; values are plain Python (None for missing) for the writers."""
+    if not rows:
+        return rows
+    with metrics.timer("normalize_records"):
+        typed = normalize_frame(pd.DataFrame(rows))[list(TYPED_COLUMNS)]
+        typed = typed.astype(object).where(typed.notna(), None)
+        converters = {'price_kwd': float, 'views': int, 'ads_count': int,
+                      'member_since': pd.Timestamp.to_pydatetime, 'published_at': pd.Timestamp.to_pydatetime}
+        columns = {
+            column: [convert(value) if value is not None else None for value in typed[column].tolist()]
+            for column, convert in converters.items()
+        }
+        return [{**row, **{column: values[index] for column, values in columns.items()}} for index, row in enumerate(rows)]
@@ -0,0 +1,86 @@
+import asyncio
+import copy
+from collections import OrderedDict
+from urllib.parse import urlsplit, urlunsplit
+from NextData import ad_id_from_link
+
+
+# Single-flight coalescing of detail fetches within a run: concurrent requests for the same ad share
+# one in-flight fetch, and finished results are served from a bounded LRU map. Pinned ads repeat on
+# every listing page and pagination shifts while the crawl runs, so the same ad is asked for often.
+class RequestCoalescer:
+    def __init__(self, max_entries=2000):
+        self.max_entries = max_entries  # Finished results kept in memory, least recently used dropped first
+        self.requests = 0  # Calls to fetch
+        self.fetches = 0  # Calls that actually ran the fetch
+        self.joined = 0  # Calls that waited on a fetch already in flight for the same key
+        self.hits = 0  # Calls served from a finished result
+        self.failures = 0  # Fetches that raised (not remembered, the next call fetches again)
+        self.evicted = 0
+        self._results = OrderedDict()  # key -> finished result
+        self._in_flight = {}  # key -> Task of the running fetch
+
+    @staticmethod
+    def key_for(url):
+        """Coalescing key of an ad: its numeric id when the link carries one, else the URL without query, fragment or trailing slash."""
+        ad_id = ad_id_from_link(url)
+        if ad_id:
+            return ad_id
+        parts = urlsplit(url or '')
+        return urlunsplit((parts.scheme.lower(), parts.netloc.lower(), parts.path.rstrip('/'), '', ''))
+
+    @property
+    def saved(self):
+        """Detail visits saved during the run."""
+        return self.joined + self.hits
+
+    async def fetch(self, url, fetch, remember=bool):
+        """Return fetch(url)'s result, sharing a fetch in flight for the same ad or reusing a finished one.
+
+        remember(result) decides whether a result is kept for later calls (partial results are not).
+        Every caller gets its own copy, so callers may update the result in place.
+        """
+        self.requests += 1
+        key = self.key_for(url)
+        if key in self._results:
+            self._results.move_to_end(key)
+            self.hits += 1
+            return copy.deepcopy(self._results[key])
+
+        task = self._in_flight.get(key)
+        if task is None:
+            self.fetches += 1
+            task = asyncio.ensure_future(fetch(url))
+            self._in_flight[key] = task
+            task.add_done_callback(lambda done: self._finish(key, done, remember))
+        else:
+            self.joined += 1
+        # Shielded: a cancelled caller does not cancel the fetch the other callers are waiting on
+        return copy.deepcopy(await asyncio.shield(task))
+
+    def stats(self):
+        """Return request and saved-visit counters for the run."""
+        return {
+            'requests': self.requests,
+            'fetches': self.fetches,
+            'joined_in_flight': self.joined,
+            'result_hits': self.hits,
+            'saved_visits': self.saved,
+            'failures': self.failures,
+            'evicted': self.evicted,
+            'entries': len(self._results),
+        }
+
+    def _finish(self, key, task, remember):
+        self._in_flight.pop(key, None)
+        if task.cancelled() or task.exception() is not None:
+            self.failures += 1
+            return
+        result = task.result()
+        if not remember(result):
+            return
+        self._results[key] = result
+        self._results.move_to_end(key)
+        while len(self._results) > self.max_entries:
+            self._results.popitem(last=False)
+            self.evicted += 1
@@ -0,0 +1,238 @@
+import argparse
+import json
+import sqlite3
+import time
+from datetime import date, datetime, timedelta
+from pathlib import Path
+from NextData import ad_id_from_link
+from RecordNormalizer import DATE_FORMAT, TYPED_COLUMNS, normalize_records
+from RunMetrics import metrics
+from StreamingSink import StreamingExcelWriter
+
+# Typed columns stored as their own SQL columns (queried and indexed); the scraped row is kept as JSON
+STORE_COLUMNS = ('ad_id', 'section', 'category', 'date_published', 'link', 'title') + TYPED_COLUMNS
+
+UPSERT_SQL = (
+    f"INSERT INTO ads ({', '.join(STORE_COLUMNS)}, record, first_seen, last_seen) "
+    f"VALUES ({', '.join('?' * (len(STORE_COLUMNS) + 3))}) "
+    "ON CONFLICT(ad_id) DO UPDATE SET "
+    + ', '.join(f"{column} = excluded.{column}" for column in STORE_COLUMNS[1:] + ('record', 'last_seen'))
+)
+
+
+def category_file_name(category):
+    """File name of a category's Excel output."""
+    safe_name = category.replace('/', '_').replace('\\', '_')  # Sanitize file name
+    return f"{safe_name}.xlsx"
+
+
+# Local store of every collected ad across runs, indexed by ad id, category and date_published, so
+# questions spanning days ("all watches from the last 30 days") are one indexed query instead of
+# downloading and re-reading the daily spreadsheets; the per-category Excel files can be rebuilt from it.
+class ResultsStore:
+    def __init__(self, path="results.sqlite3"):
+        self.path = path  # SQLite file kept between runs
+        self.inserted = 0  # Ads stored for the first time during the run
+        self.updated = 0  # Ads stored again (re-scraped or replayed) during the run
+        self.skipped = 0  # Rows without an id or link
+        self.batches = 0
+        self._conn = None
+
+    def __enter__(self):
+        self.open()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+
+    def open(self):
+        """Open the store, creating the table and its indexes."""
+        self._conn = sqlite3.connect(self.path)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS ads ("
+            "ad_id TEXT PRIMARY KEY, section TEXT NOT NULL, category TEXT NOT NULL, date_published TEXT, "
+            "link TEXT, title TEXT, price_kwd REAL, views INTEGER, ads_count INTEGER, member_since TEXT, "
+            "published_at TEXT, record TEXT NOT NULL, first_seen REAL NOT NULL, last_seen REAL NOT NULL)"
+        )
+        # ad_id ends both indexes so the newest-first ORDER BY of query is read straight from them
+        self._conn.execute("CREATE INDEX IF NOT EXISTS ads_category_date ON ads (category, date_published, ad_id)")
+        self._conn.execute("CREATE INDEX IF NOT EXISTS ads_date ON ads (date_published, ad_id)")
+        self._conn.commit()
+
+    def close(self):
+        """Commit pending writes and close the store."""
+        if self._conn is not None:
+            self._conn.commit()
+            self._conn.close()
+            self._conn = None
+
+    @staticmethod
+    def key_for(row):
+        """Store key of a row: the ad id, else the id in its link, else the link itself."""
+        if row.get('id') not in (None, ''):
+            return str(row['id'])
+        return ad_id_from_link(row.get('link')) or row.get('link')
+
+    def upsert(self, section, category, rows):
+        """Insert or refresh a batch of rows (as written to the Excel sink) in one transaction."""
+        if rows and any(column not in rows[0] for column in TYPED_COLUMNS):
+            rows = normalize_records(rows)  # Sink without typed columns: compute them for the store only
+        now = time.time()
+        params = []
+        for row in rows:
+            key = self.key_for(row)
+            if not key:
+                self.skipped += 1
+                continue
+            typed = [_sql_value(row.get(column)) for column in TYPED_COLUMNS]
+            record = {column: value for column, value in row.items() if column not in TYPED_COLUMNS}
+            date_published = row.get('date_published') or typed[TYPED_COLUMNS.index('published_at')]
+            params.append((key, section, category, date_published, row.get('link'), row.get('title'), *typed,
+                           json.dumps(record, ensure_ascii=False, default=str), now, now))
+        if not params:
+            return
+        with metrics.timer("results_upsert"):
+            keys = [param[0] for param in params]
+            existing = set()
+            for start in range(0, len(keys), 500):  # Below SQLite's bound-parameter limit
+                chunk = keys[start:start + 500]
+                existing.update(row[0] for row in self._conn.execute(
+                    f"SELECT ad_id FROM ads WHERE ad_id IN ({', '.join('?' * len(chunk))})", chunk
+                ))
+            with self._conn:
+                self._conn.executemany(UPSERT_SQL, params)
+        new_keys = set(keys) - existing
+        self.inserted += len(new_keys)
+        self.updated += len(params) - len(new_keys)
+        self.batches += 1
+
+    def query(self, category=None, section=None, since=None, until=None, limit=None):
+        """Rows published between since and until (inclusive "YYYY-MM-DD" days), newest first, with the typed columns."""
+        where, params = self._filters(category, section, since, until)
+        sql = f"SELECT record, {', '.join(TYPED_COLUMNS)} FROM ads{where} ORDER BY date_published DESC, ad_id DESC"
+        if limit is not None:
+            sql += " LIMIT ?"
+            params.append(limit)
+        rows = []
+        for record, *typed in self._conn.execute(sql, params):
+            rows.append({**json.loads(record), **dict(zip(TYPED_COLUMNS, typed))})
+        return rows
+
+    def count(self, category=None, section=None, since=None, until=None):
+        """Number of stored ads matching the same filters as query."""
+        where, params = self._filters(category, section, since, until)
+        return self._conn.execute(f"SELECT COUNT(*) FROM ads{where}", params).fetchone()[0]
+
+    def categories(self, section=None, since=None, until=None):
+        """(section, category) pairs having ads in the period."""
+        where, params = self._filters(None, section, since, until)
+        return self._conn.execute(f"SELECT DISTINCT section, category FROM ads{where} ORDER BY section, category", params).fetchall()
+
+    def export_excel(self, path, category, section=None, since=None, until=None, batch_size=200):
+        """Write one category's ads of the period to an Excel file like the crawler's; returns its path, or None without rows."""
+        rows = self.query(category=category, section=section, since=since, until=until)
+        if not rows:
+            return None
+        Path(path).parent.mkdir(parents=True, exist_ok=True)
+        # Typed columns are recomputed by the normalizer, so the file matches what the crawl writes
+        sink = StreamingExcelWriter(path, batch_size=batch_size, transform=normalize_records)
+        for start in range(0, len(rows), batch_size):
+            sink.append([{column: value for column, value in row.items() if column not in TYPED_COLUMNS}
+                         for row in rows[start:start + batch_size]])
+        return sink.close()
+
+    def export_category_files(self, out_dir, section=None, since=None, until=None):
+        """Export every category with ads in the period to out_dir/<section>/<category>.xlsx; returns the paths."""
+        files = []
+        for section_name, category in self.categories(section, since, until):
+            path = Path(out_dir) / section_name / category_file_name(category)
+            if self.export_excel(path, category, section=section_name, since=since, until=until):
+                files.append(path)
+        return files
+
+    def merge(self, path):
+        """Copy the ads of another store file (e.g. another shard's) into this one; the latest scrape wins."""
+        self._conn.execute("ATTACH DATABASE ? AS other", (str(path),))
+        try:
+            with self._conn:
+                self._conn.execute(
+                    "INSERT INTO ads SELECT * FROM other.ads WHERE true "
+                    "ON CONFLICT(ad_id) DO UPDATE SET "
+                    + ', '.join(f"{column} = excluded.{column}" for column in STORE_COLUMNS[1:] + ('record', 'last_seen'))
+                    + ", first_seen = MIN(ads.first_seen, excluded.first_seen) WHERE excluded.last_seen > ads.last_seen"
+                )
+        finally:
+            self._conn.execute("DETACH DATABASE other")
+
+    def stats(self):
+        """Return write counters for the run and the store's size."""
+        return {
+            'inserted': self.inserted,
+            'updated': self.updated,
+            'skipped': self.skipped,
+            'batches': self.batches,
+            'rows': self._conn.execute("SELECT COUNT(*) FROM ads").fetchone()[0] if self._conn is not None else None,
+        }
+
+    @staticmethod
+    def _filters(category, section, since, until):
+        clauses, params = [], []
+        if category is not None:
+            clauses.append("category = ?")
+            params.append(category)
+        if section is not None:
+            clauses.append("section = ?")
+            params.append(section)
+        if since is not None:
+            clauses.append("date_published >= ?")
+            params.append(since)
+        if until is not None:  # date_published holds a time too, so compare against the next day
+            clauses.append("date_published < ?")
+            params.append((date.fromisoformat(until) + timedelta(days=1)).isoformat())
+        return (" WHERE " + " AND ".join(clauses) if clauses else ""), params
+
+
+def _sql_value(value):
+    # Typed values as SQLite stores them: datetimes as DATE_FORMAT text, numbers as they are
+    if isinstance(value, datetime):
+        return value.strftime(DATE_FORMAT)
+    if isinstance(value, date):
+        return value.isoformat()
+    return value
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Rebuild per-category Excel files from the local results store.")
+    parser.add_argument("--db", action="append", help="Store file; repeat to merge shard stores into the first (default: results.sqlite3)")
+    parser.add_argument("--section", help="Only export this section")
+    parser.add_argument("--category", help="Only export this category")
+    parser.add_argument("--days", type=int, help="Ads published in the last N days")
+    parser.add_argument("--since", help="First publication day, YYYY-MM-DD")
+    parser.add_argument("--until", help="Last publication day, YYYY-MM-DD")
+    parser.add_argument("--out-dir", default="exports", help="Folder receiving <section>/<category>.xlsx (default: %(default)s)")
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    paths = args.db or ["results.sqlite3"]
+    since = args.since or ((date.today() - timedelta(days=args.days)).isoformat() if args.days else None)
+    with ResultsStore(paths[0]) as store:
+        for other in paths[1:]:
+            store.merge(other)
+        if args.category:
+            files = [path for path in [store.export_excel(
+                Path(args.out_dir) / (args.section or "all") / category_file_name(args.category),
+                args.category, section=args.section, since=since, until=args.until,
+            )] if path]
+        else:
+            files = store.export_category_files(args.out_dir, section=args.section, since=since, until=args.until)
+    for path in files:
+        print(f"Exported {path}")
+    if not files:
+        print("No ads in the store for this period")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,125 @@
+import json
+import os
+import time
+from pathlib import Path
+
+
+# Append-only JSONL checkpoint of a daily run, so an interrupted run resumes where it stopped.
+# Records: "page" (a listing page's filtered cards and pagination state), "ad" (a finished ad row)
+# and "done" (a category whose file was uploaded, or that had nothing to upload).
+class RunJournal:
+    def __init__(self, path, fsync_every=50, fsync_interval=2.0, keep_days=3):
+        self.path = Path(path)  # One journal per target date, e.g. run_journal/2025-07-15.jsonl
+        self.fsync_every = fsync_every  # Records written between two fsyncs
+        self.fsync_interval = fsync_interval  # Max seconds a record may wait for its fsync
+        self.keep_days = keep_days  # Journals of older runs are deleted on open
+        self.resumed_records = 0  # Records loaded from an earlier attempt of the same run
+        self.written = 0  # Records written by this attempt
+        self.fsync_count = 0
+        self._pages = {}  # (section, category, url) -> page record
+        self._ads = {}  # (section, category) -> {link: card}
+        self._done = set()  # (section, category)
+        self._file = None
+        self._unsynced = 0
+        self._last_sync = time.monotonic()
+
+    def __enter__(self):
+        self.open()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+
+    def open(self):
+        """Load the records of an earlier attempt (if any) and open the journal for appending."""
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._remove_old_journals()
+        if self.path.exists():
+            good_size = 0
+            with open(self.path, "rb") as f:
+                for line in f:
+                    try:
+                        record = json.loads(line)
+                    except ValueError:
+                        break  # Torn last line of a killed run
+                    self._apply(record)
+                    self.resumed_records += 1
+                    good_size += len(line)
+            # Drop the torn tail so new records are not appended after it
+            if good_size < self.path.stat().st_size:
+                os.truncate(self.path, good_size)
+        self._file = open(self.path, "a", encoding="utf-8")
+
+    def close(self):
+        """Flush, fsync and close the journal."""
+        if self._file is not None:
+            self.sync()
+            self._file.close()
+            self._file = None
+
+    def sync(self):
+        """Force buffered records to disk."""
+        if self._file is None or not self._unsynced:
+            return
+        self._file.flush()
+        os.fsync(self._file.fileno())
+        self.fsync_count += 1
+        self._unsynced = 0
+        self._last_sync = time.monotonic()
+
+    def page(self, section, category, url):
+        """Return the checkpoint of a listing page scraped by an earlier attempt, or None."""
+        return self._pages.get((section, category, url))
+
+    def ads(self, section, category):
+        """Return {link: card} of the ads of a category finished by earlier attempts."""
+        return self._ads.get((section, category), {})
+
+    def is_done(self, section, category):
+        return (section, category) in self._done
+
+    def record_page(self, section, category, url, basic_cards, page_count, reached_older_ads):
+        self._write({
+            'type': 'page', 'section': section, 'category': category, 'url': url,
+            'cards': basic_cards, 'page_count': page_count, 'reached_older_ads': reached_older_ads,
+        })
+
+    def record_ad(self, section, category, link, card):
+        self._write({'type': 'ad', 'section': section, 'category': category, 'link': link, 'card': card})
+
+    def record_done(self, section, category):
+        self._write({'type': 'done', 'section': section, 'category': category})
+        self.sync()
+
+    def stats(self):
+        """Return resume and write counters for the run."""
+        return {
+            'resumed_records': self.resumed_records,
+            'written': self.written,
+            'fsync_count': self.fsync_count,
+            'done_categories': len(self._done),
+        }
+
+    def _apply(self, record):
+        key = (record.get('section'), record.get('category'))
+        if record.get('type') == 'page':
+            self._pages[key + (record['url'],)] = record
+        elif record.get('type') == 'ad':
+            self._ads.setdefault(key, {})[record['link']] = record['card']
+        elif record.get('type') == 'done':
+            self._done.add(key)
+
+    def _write(self, record):
+        self._apply(record)
+        self._file.write(json.dumps(record, ensure_ascii=False, default=str) + "\n")
+        self.written += 1
+        self._unsynced += 1
+        # fsync in batches: the hot path only pays for a buffered write
+        if self._unsynced >= self.fsync_every or time.monotonic() - self._last_sync >= self.fsync_interval:
+            self.sync()
+
+    def _remove_old_journals(self):
+        cutoff = time.time() - self.keep_days * 86400
+        for journal in self.path.parent.glob("*.jsonl"):
+            if journal != self.path and journal.stat().st_mtime < cutoff:
+                journal.unlink()
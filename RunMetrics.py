@@ -0,0 +1,123 @@
+import functools
+import html
+import inspect
+import json
+import time
+from collections import defaultdict
+from contextlib import contextmanager
+from pathlib import Path
+
+
+# Per-stage timings, counts and bytes for a run; cheap enough to leave on in production
+class RunMetrics:
+    def __init__(self):
+        self.started = time.time()  # Wall-clock start of the run
+        self._durations = defaultdict(list)  # stage -> seconds per call
+        self._bytes = defaultdict(int)  # stage -> bytes moved
+        self._errors = defaultdict(int)  # stage -> calls that raised
+
+    def record(self, stage, seconds, nbytes=0):
+        """Record one call of a stage."""
+        self._durations[stage].append(seconds)
+        if nbytes:
+            self._bytes[stage] += nbytes
+
+    def add_bytes(self, stage, nbytes):
+        """Attribute bytes to a stage without recording a call."""
+        self._bytes[stage] += nbytes
+
+    @contextmanager
+    def timer(self, stage):
+        """Time the enclosed block as one call of stage (usable in sync and async code)."""
+        started = time.perf_counter()
+        try:
+            yield
+        except BaseException:
+            self._errors[stage] += 1
+            raise
+        finally:
+            self._durations[stage].append(time.perf_counter() - started)
+
+    def summary(self):
+        """Return {stage: count, errors, total/p50/p95/p99/max seconds, bytes}, slowest stages first."""
+        stages = {}
+        for stage in set(self._durations) | set(self._bytes):
+            durations = sorted(self._durations.get(stage, ()))
+            stages[stage] = {
+                'count': len(durations),
+                'errors': self._errors.get(stage, 0),
+                'total': round(sum(durations), 3),
+                'p50': _percentile(durations, 50),
+                'p95': _percentile(durations, 95),
+                'p99': _percentile(durations, 99),
+                'max': round(durations[-1], 4) if durations else None,
+                'bytes': self._bytes.get(stage, 0),
+            }
+        return dict(sorted(stages.items(), key=lambda item: -item[1]['total']))
+
+    def report(self, extra=None):
+        """Return the run report: wall time, per-stage summary and any extra sections."""
+        return {
+            'started': time.strftime("%Y-%m-%d %H:%M:%S", time.localtime(self.started)),
+            'wall_seconds': round(time.time() - self.started, 1),
+            'stages': self.summary(),
+            **(extra or {}),
+        }
+
+    def write_report(self, json_path="run_report.json", html_path="run_report.html", extra=None):
+        """Write the run report as JSON and as a standalone HTML table; returns the report."""
+        report = self.report(extra)
+        Path(json_path).write_text(json.dumps(report, ensure_ascii=False, indent=2, default=str), encoding="utf-8")
+        Path(html_path).write_text(_render_html(report), encoding="utf-8")
+        return report
+
+
+def _percentile(sorted_values, percent):
+    # Nearest-rank percentile of an already sorted list
+    if not sorted_values:
+        return None
+    index = max(0, min(len(sorted_values) - 1, int(round(percent / 100 * len(sorted_values))) - 1))
+    return round(sorted_values[index], 4)
+
+
+def _render_html(report):
+    columns = ('count', 'errors', 'total', 'p50', 'p95', 'p99', 'max', 'bytes')
+    rows = "\n".join(
+        "<tr><td>{}</td>{}</tr>".format(
+            html.escape(stage), "".join(f"<td>{values[column] if values[column] is not None else ''}</td>" for column in columns)
+        )
+        for stage, values in report['stages'].items()
+    )
+    extra = {key: value for key, value in report.items() if key not in ('stages',)}
+    return (
+        "<!DOCTYPE html>\n<html><head><meta charset=\"utf-8\"><title>Scraper run report</title>"
+        "<style>body{font-family:sans-serif}table{border-collapse:collapse}"
+        "td,th{border:1px solid #ccc;padding:4px 8px;text-align:right}td:first-child{text-align:left}</style></head><body>\n"
+        "<h1>Scraper run report</h1>\n<h2>Stages (seconds)</h2>\n<table>\n<tr><th>stage</th>"
+        + "".join(f"<th>{column}</th>" for column in columns) + "</tr>\n"
+        + rows + "\n</table>\n<h2>Run</h2>\n<pre>"
+        + html.escape(json.dumps(extra, ensure_ascii=False, indent=2, default=str))
+        + "</pre>\n</body></html>\n"
+    )
+
+
+# Process-wide metrics: every module records into it, the crawler writes the report at the end
+metrics = RunMetrics()
+
+
+def timed(stage):
+    """Decorator timing every call of a sync or async function as one call of stage."""
+    def decorate(func):
+        if inspect.iscoroutinefunction(func):
+            @functools.wraps(func)
+            async def async_wrapper(*args, **kwargs):
+                with metrics.timer(stage):
+                    return await func(*args, **kwargs)
+            return async_wrapper
+
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            with metrics.timer(stage):
+                return func(*args, **kwargs)
+        return wrapper
+    return decorate
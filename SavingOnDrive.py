@@ -0,0 +1,90 @@
+from DriveClient import DriveClient  # Process-wide Drive client shared by every entry point
+from datetime import datetime, timedelta  # For handling time and dates
+
+# Uploads files into dated subfolders of one parent folder in Google Drive
+class SavingOnDrive:
+    def __init__(self, credentials_dict, parent_folder_id, drive_client=None):
+        self.credentials_dict = credentials_dict  # JSON dictionary for service account credentials
+        self.scopes = ['https://www.googleapis.com/auth/drive']  # Scope for full Drive access
+        self.upload_chunk_size = 5 * 1024 * 1024  # Resumable upload chunk size (multiple of 256 KB)
+        self.client = drive_client  # Shared DriveClient (or one wrapping a fake service), set by authenticate()
+        self.parent_folder_id = parent_folder_id  # The ID of the parent folder where subfolders will be created
+
+    def authenticate(self):
+        """Attach to the process-wide Drive client (credentials are only built once)."""
+        try:
+            if self.client is None:
+                self.client = DriveClient.shared(self.credentials_dict, self.scopes)
+            self.client.service  # Build the service now so credential errors surface here
+        except Exception as e:
+            print(f"Authentication error: {e}")
+            raise  # Re-raise exception if authentication fails
+
+    @property
+    def service(self):
+        """The authenticated Drive service object."""
+        return self.client.service if self.client else None
+
+    def get_folder_id(self, folder_name):
+        """Get folder ID by name within the parent folder."""
+        try:
+            # Lookups are memoized per (parent, name) by the shared client
+            folder_id = self.client.get_folder_id(self.parent_folder_id, folder_name)
+            if folder_id:
+                print(f"Folder '{folder_name}' found with ID: {folder_id}")
+                return folder_id
+            else:
+                print(f"Folder '{folder_name}' does not exist.")
+                return None
+        except Exception as e:
+            print(f"Error getting folder ID: {e}")
+            return None  # Return None if something went wrong
+
+    def create_folder(self, folder_name):
+        """Create a new folder in the parent folder."""
+        try:
+            print(f"Creating folder '{folder_name}'...")
+            folder_id = self.client.create_folder(self.parent_folder_id, folder_name)
+            print(f"Folder '{folder_name}' created with ID: {folder_id}")
+            return folder_id
+        except Exception as e:
+            print(f"Error creating folder: {e}")
+            raise  # Raise the exception to the caller
+
+    def get_or_create_folder(self, folder_name):
+        """Get the folder ID within the parent folder, creating the folder once if needed."""
+        try:
+            return self.client.get_or_create_folder(self.parent_folder_id, folder_name)
+        except Exception as e:
+            print(f"Error getting or creating folder: {e}")
+            raise
+
+    def upload_file(self, file_name, folder_id):
+        """Upload a single file to Google Drive."""
+        try:
+            print(f"Uploading file: {file_name}")
+            # Resumable upload, one chunk at a time
+            file_id = self.client.upload_file(file_name, folder_id, chunk_size=self.upload_chunk_size)
+            print(f"File '{file_name}' uploaded with ID: {file_id}")
+            return file_id
+        except Exception as e:
+            print(f"Error uploading file: {e}")
+            raise  # Raise the error to be handled externally
+
+    def save_files(self, files):
+        """Save files to Google Drive in a folder named after yesterday's date."""
+        try:
+            # Get yesterday’s date as a string (e.g., '2025-07-15')
+            yesterday = (datetime.now() - timedelta(days=1)).strftime('%Y-%m-%d')
+
+            folder_id = self.get_or_create_folder(yesterday)
+
+            # Upload each file to the folder
+            for file_name in files:
+                self.upload_file(file_name, folder_id)
+            
+            print(f"All files uploaded successfully to Google Drive folder '{yesterday}'.")
+        except Exception as e:
+            print(f"Error saving files: {e}")
+            raise  # Let the caller handle the exception
+
@@ -0,0 +1,89 @@
+import json
+import sqlite3
+import time
+from NextData import ad_id_from_link
+
+
+# On-disk index of ads already collected, so daily runs only visit new ads
+class SeenAdsIndex:
+    def __init__(self, path="seen_ads.sqlite3", ttl_days=14, commit_every=200):
+        self.path = path  # SQLite file kept between runs
+        self.ttl_seconds = ttl_days * 86400  # Entries not seen for this long are evicted on open
+        self.commit_every = commit_every  # Writes batched per commit
+        self.hits = 0  # Detail visits saved during the run
+        self.added = 0  # Ads added or refreshed during the run
+        self.evicted = 0  # Expired entries removed on open
+        self._keys = set()  # In-memory copy of the indexed keys for O(1) lookups
+        self._pending = 0
+        self._conn = None
+
+    def __enter__(self):
+        self.open()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+
+    def open(self):
+        """Open the index, evict expired entries and load the keys into memory."""
+        self._conn = sqlite3.connect(self.path)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS seen_ads ("
+            "key TEXT PRIMARY KEY, last_seen REAL NOT NULL, details TEXT NOT NULL)"
+        )
+        self._conn.execute("CREATE INDEX IF NOT EXISTS seen_ads_last_seen ON seen_ads (last_seen)")
+        self.evicted = self._conn.execute(
+            "DELETE FROM seen_ads WHERE last_seen < ?", (time.time() - self.ttl_seconds,)
+        ).rowcount
+        self._conn.commit()
+        self._keys = {row[0] for row in self._conn.execute("SELECT key FROM seen_ads")}
+
+    def close(self):
+        """Commit pending writes and close the index."""
+        if self._conn is not None:
+            self._conn.commit()
+            self._conn.close()
+            self._conn = None
+
+    @staticmethod
+    def key_for(link):
+        """Index key of an ad: its numeric id when the link carries one, else the link itself."""
+        return ad_id_from_link(link) or link
+
+    def __contains__(self, key):
+        return key in self._keys
+
+    def __len__(self):
+        return len(self._keys)
+
+    def get(self, key):
+        """Return the stored details of a seen ad and mark it as seen again, or None."""
+        if key not in self._keys:
+            return None
+        row = self._conn.execute("SELECT details FROM seen_ads WHERE key = ?", (key,)).fetchone()
+        if row is None:
+            return None
+        self._write("UPDATE seen_ads SET last_seen = ? WHERE key = ?", (time.time(), key))
+        self.hits += 1
+        return json.loads(row[0])
+
+    def add(self, key, details):
+        """Store (or refresh) the details of an ad."""
+        self._write(
+            "INSERT OR REPLACE INTO seen_ads (key, last_seen, details) VALUES (?, ?, ?)",
+            (key, time.time(), json.dumps(details, ensure_ascii=False)),
+        )
+        self._keys.add(key)
+        self.added += 1
+
+    def stats(self):
+        """Return index counters for the run."""
+        return {'size': len(self._keys), 'hits': self.hits, 'added': self.added, 'evicted': self.evicted}
+
+    def _write(self, sql, params):
+        self._conn.execute(sql, params)
+        self._pending += 1
+        if self._pending >= self.commit_every:
+            self._conn.commit()
+            self._pending = 0
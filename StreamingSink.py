@@ -0,0 +1,78 @@
+import os
+from pathlib import Path
+from openpyxl import Workbook
+from openpyxl.cell.cell import ILLEGAL_CHARACTERS_RE
+from RunMetrics import metrics
+
+
+# Excel sink that takes rows as they are scraped and writes them in bounded batches to a write-only
+# openpyxl workbook (rows are streamed to a temp file, not kept in memory)
+class StreamingExcelWriter:
+    def __init__(self, path, columns=None, batch_size=200, sheet_name="Sheet1", transform=None, on_flush=None):
+        self.path = Path(path)  # Output file
+        self.columns = list(columns) if columns else None  # Taken from the first row when not given
+        self.batch_size = batch_size  # Rows buffered before they are written out
+        self.transform = transform  # Optional function run on each batch of rows before writing (e.g. normalize_records)
+        self.on_flush = on_flush  # Optional function called with each written batch (e.g. a ResultsStore upsert)
+        self.row_count = 0  # Rows accepted so far
+        self._buffer = []
+        self._workbook = Workbook(write_only=True)
+        self._sheet = self._workbook.create_sheet(sheet_name)
+        self._header_written = False
+
+    def append(self, rows):
+        """Accept a batch of row dicts; they are written once batch_size rows are buffered."""
+        for row in rows:
+            if self.columns is None:
+                self.columns = list(row.keys())
+            self._buffer.append(row)
+            self.row_count += 1
+        if len(self._buffer) >= self.batch_size:
+            self.flush()
+
+    def flush(self):
+        """Write the buffered rows."""
+        if not self._buffer:
+            return
+        rows = self._buffer
+        if self.transform is not None:
+            rows = self.transform(rows)
+            # Columns added by the transform go after the scraped ones
+            self.columns += [column for column in rows[0] if column not in self.columns]
+        with metrics.timer("sink_flush"):
+            self._write_rows([[row.get(column) for column in self.columns] for row in rows])
+        self._buffer = []
+        if self.on_flush is not None:
+            self.on_flush(rows)
+
+    def close(self):
+        """Flush and save the workbook; returns its path."""
+        self.flush()
+        with metrics.timer("sink_close"):
+            if not self._header_written and self.columns:
+                self._sheet.append(self.columns)
+            self._workbook.save(self.path)
+        metrics.add_bytes("sink_close", self.path.stat().st_size)
+        return self.path
+
+    def discard(self):
+        """Drop buffered rows and remove any partial output."""
+        self._buffer = []
+        if self.path.exists():
+            os.remove(self.path)
+
+    @staticmethod
+    def _cell_value(value):
+        # Lists/dicts are written as text, like DataFrame.to_excel does for object columns
+        if isinstance(value, (list, dict, tuple)):
+            value = str(value)
+        if isinstance(value, str):
+            value = ILLEGAL_CHARACTERS_RE.sub('', value)
+        return value
+
+    def _write_rows(self, rows):
+        if not self._header_written:
+            self._sheet.append(self.columns)
+            self._header_written = True
+        for row in rows:
+            self._sheet.append([self._cell_value(value) for value in row])
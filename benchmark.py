@@ -0,0 +1,327 @@
+import argparse
+import asyncio
+import json
+import os
+import resource
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from datetime import datetime, timedelta
+from pathlib import Path
+
+REPO_DIR = Path(__file__).resolve().parent
+sys.path.insert(0, str(REPO_DIR))
+
+from CategoryCrawler import CategoryCrawler, Section
+from DetailsScraper import DetailsScraping
+from ExtractionEngine import SELECTORS
+from FetchLimiter import FetchLimiter
+from HttpFetcher import HttpFetcher
+from LocalSiteServer import LocalSiteServer
+from MemoryGovernor import MemoryGovernor
+from NextDataFetcher import NextDataFetcher
+from RunMetrics import metrics
+
+HISTORY_FILE = REPO_DIR / "bench_history.jsonl"  # One line per scenario per benchmark run
+OUTPUT_FILE = REPO_DIR / "bench_output.txt"  # Human-readable result of the last run
+BUILD_ID = "bench-build"  # buildId of the generated site, served under /_next/data/<buildId>/
+
+
+def _classes(selector):
+    # '.a.b.c' -> 'a b c'
+    return " ".join(part for part in selector.split(".") if part)
+
+
+def _next_data_script(page_props):
+    payload = json.dumps({"props": {"pageProps": page_props}, "buildId": BUILD_ID}, ensure_ascii=False)
+    return f'<script id="__NEXT_DATA__" type="application/json">{payload}</script>'
+
+
+def _write_data_route(root_dir, path, page_props):
+    # The JSON Next.js serves for client-side navigations to path
+    data_path = root_dir / "_next" / "data" / BUILD_ID / f"{path.strip('/')}.json"
+    data_path.parent.mkdir(parents=True, exist_ok=True)
+    data_path.write_text(json.dumps({"pageProps": page_props}, ensure_ascii=False), encoding="utf-8")
+
+
+def _listing_props(category, ad_ids, page_count, published):
+    listings = [
+        {"id": ad_id, "url": f"/ar/listing/{ad_id}", "title": f"اعلان تجريبي {ad_id}", "category": {"name": category},
+         "date_published": published, "price": 10 + ad_id % 90, "views": ad_id % 500}
+        for ad_id in ad_ids
+    ]
+    return {"listings": listings, "pagination": {"total_pages": page_count}}
+
+
+def _detail_listing(ad_id, published):
+    return {
+        "id": ad_id,
+        "description": f"وصف الاعلان {ad_id}",
+        "image": f"/images/{ad_id}.jpg",
+        "price": 10 + ad_id % 90,
+        "address": "الكويت",
+        "bool_attrs": ["توصيل"],
+        "attrs": [{"name": "الحالة", "value": "جديد"}],
+        "views": ad_id % 500,
+        "user": {"name": f"مستخدم {ad_id % 50}", "listings_count": ad_id % 30, "member_since": "عضو منذ يناير 2020"},
+        "phone": f"9{ad_id:07d}",
+        "date_published": published,
+    }
+
+
+def _listing_page(category, number, ad_ids, page_count, published, padding):
+    cards = "\n".join(
+        f'<a class="{_classes(SELECTORS["card"])}" href="/ar/listing/{ad_id}">'
+        f'<div class="{_classes(SELECTORS["card_type"])}">{category}</div>'
+        f'<div class="{_classes(SELECTORS["card_title"])}">اعلان تجريبي {ad_id}</div>'
+        f'<div class="{_classes(SELECTORS["card_tags"])}"></div></a>'
+        for ad_id in ad_ids
+    )
+    return (
+        f"<!DOCTYPE html><html><head><title>{category} {number}</title></head><body>\n{cards}\n"
+        f"<div>{padding}</div>\n"
+        + _next_data_script(_listing_props(category, ad_ids, page_count, published))
+        + "</body></html>\n"
+    )
+
+
+def _detail_page(ad_id, published, padding):
+    listing = _detail_listing(ad_id, published)
+    return (
+        f"<!DOCTYPE html><html><head><title>{ad_id}</title></head><body>\n"
+        f'<div class="{_classes(SELECTORS["id_parent"])}"><span class="{_classes(SELECTORS["id_text"])}">رقم الاعلان: {ad_id}</span></div>\n'
+        f'<div class="{_classes(SELECTORS["price"])}">{listing["price"]} KWD</div>\n'
+        f'<div class="{_classes(SELECTORS["description"])}">{listing["description"]}</div>\n'
+        f"<div>{padding}</div>\n"
+        + _next_data_script({"listing": listing})
+        + "</body></html>\n"
+    )
+
+
+def generate_site(root_dir, categories=3, pages=3, ads_per_page=20, page_kb=60):
+    """Write a stand-in for q84sale.com: listing pages under ar/bench/<category>/<n>, ads under ar/listing/<id>
+    and the Next.js data route of every page under _next/data/<buildId>/."""
+    root_dir = Path(root_dir)
+    published = (datetime.now() - timedelta(days=1)).replace(hour=12, minute=0, second=0).strftime("%Y-%m-%dT%H:%M:%S")
+    padding = "x" * (page_kb * 1024)  # Real pages are mostly markup and scripts the scraper ignores
+    next_id = 100000
+    layout = {}
+    for category_index in range(categories):
+        category = f"category-{category_index + 1}"
+        layout[category] = [(f"/ar/bench/{category}/{{}}", pages)]
+        for number in range(1, pages + 1):
+            ad_ids = list(range(next_id, next_id + ads_per_page))
+            next_id += ads_per_page
+            listing_path = root_dir / "ar" / "bench" / category / f"{number}.html"
+            listing_path.parent.mkdir(parents=True, exist_ok=True)
+            listing_path.write_text(_listing_page(category, number, ad_ids, pages, published, padding), encoding="utf-8")
+            _write_data_route(root_dir, f"ar/bench/{category}/{number}", _listing_props(category, ad_ids, pages, published))
+            for ad_id in ad_ids:
+                detail_path = root_dir / "ar" / "listing" / f"{ad_id}.html"
+                detail_path.parent.mkdir(parents=True, exist_ok=True)
+                detail_path.write_text(_detail_page(ad_id, published, padding), encoding="utf-8")
+                _write_data_route(root_dir, f"ar/listing/{ad_id}", {"listing": _detail_listing(ad_id, published)})
+    return layout
+
+
+def _cpu_seconds():
+    own = resource.getrusage(resource.RUSAGE_SELF)
+    children = resource.getrusage(resource.RUSAGE_CHILDREN)  # Chromium runs as child processes
+    return own.ru_utime + own.ru_stime + children.ru_utime + children.ru_stime
+
+
+def _sample_peak_rss(stop, peak, interval=0.05):
+    # Current RSS of this process plus its browsers until stop is set; ru_maxrss would carry the peak of earlier scenarios
+    governor = MemoryGovernor()
+    while True:
+        sample = governor.measure()
+        peak[0] = max(peak[0], sample['python_rss_mb'] + sample.get('browser_rss_mb', 0))
+        if stop.wait(interval):
+            return
+
+
+def _stage_calls(stage):
+    return metrics.summary().get(stage, {}).get('count', 0)
+
+
+async def bench_details_scraping(base_url, layout, fetch_mode, max_concurrent):
+    """Run DetailsScraping page by page over every generated listing page; returns (pages, ads)."""
+    limiter = FetchLimiter(max_concurrent=max_concurrent, per_host_interval=0, max_rate=1000)
+    pages = ads = 0
+    async with HttpFetcher(max_connections=max_concurrent) as fetcher:
+        next_data_fetcher = NextDataFetcher(fetcher, limiter)
+        for urls in layout.values():
+            for url_template, page_count in urls:
+                for number in range(1, page_count + 1):
+                    scraper = DetailsScraping(
+                        base_url + url_template.format(number),
+                        fetch_limiter=limiter,
+                        detail_workers=max_concurrent,
+                        extraction_mode="next_data",
+                        fetch_mode=fetch_mode,
+                        http_fetcher=fetcher,
+                        next_data_fetcher=next_data_fetcher,
+                    )
+                    cards = await scraper.get_card_details()
+                    pages += 1
+                    ads += len(cards)
+    return pages, ads
+
+
+async def bench_category_crawler(base_url, layout, fetch_mode, max_concurrent, work_dir):
+    """Run CategoryCrawler's queue over the generated categories without Drive; returns (pages crawled, ads)."""
+    crawler = CategoryCrawler([])
+    crawler.fetch_mode = fetch_mode
+    crawler.max_concurrent_ads = max_concurrent
+    crawler.per_host_interval = 0
+    crawler.max_host_rate = 1000
+    Path(work_dir).mkdir(parents=True, exist_ok=True)
+    crawler.temp_dir = Path(work_dir) / "temp_files"
+    crawler.seen_index_path = str(Path(work_dir) / "seen_ads.sqlite3")
+    crawler.journal_dir = Path(work_dir) / "run_journal"
+    crawler.http_cache_path = str(Path(work_dir) / "http_cache.sqlite3")
+    crawler.results_store_path = str(Path(work_dir) / "results.sqlite3")
+    section = Section("bench", "", "", {
+        category: [(base_url + url_template, page_count) for url_template, page_count in urls]
+        for category, urls in layout.items()
+    })
+    target_date = (datetime.now() - timedelta(days=1)).strftime("%Y-%m-%d")
+    pages_before = _stage_calls("crawl_page")
+    await crawler.open_resources(target_date)
+    try:
+        await crawler.crawl([section], target_date)
+    finally:
+        await crawler.close_resources()
+    pages = _stage_calls("crawl_page") - pages_before  # Pagination may stop before the layout's page counts
+    ads = sum(len(crawler.journal.ads(section.name, category)) for category in layout)
+    return pages, ads
+
+
+def run_scenario(name, coroutine_factory):
+    stop, peak = threading.Event(), [0.0]
+    sampler = threading.Thread(target=_sample_peak_rss, args=(stop, peak), daemon=True)
+    sampler.start()
+    cpu_before = _cpu_seconds()
+    started = time.perf_counter()
+    try:
+        pages, ads = asyncio.run(coroutine_factory())
+    finally:
+        stop.set()
+        sampler.join()
+    elapsed = time.perf_counter() - started
+    return {
+        'scenario': name,
+        'pages': pages,
+        'ads': ads,
+        'seconds': round(elapsed, 3),
+        'pages_per_sec': round(pages / elapsed, 2) if elapsed else None,
+        'ads_per_sec': round(ads / elapsed, 2) if elapsed else None,
+        'cpu_seconds': round(_cpu_seconds() - cpu_before, 2),
+        'peak_rss_mb': round(peak[0], 1),  # Sampled during this scenario only
+    }
+
+
+def _git_commit():
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], cwd=REPO_DIR, capture_output=True, text=True, check=True
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def _previous_results(history_file, fixture, commit):
+    # Latest result per scenario from another commit with the same fixture
+    previous = {}
+    if not Path(history_file).exists():
+        return previous
+    with open(history_file, encoding="utf-8") as f:
+        for line in f:
+            entry = json.loads(line)
+            if entry.get('fixture') == fixture and entry.get('commit') != commit:
+                previous[entry['scenario']] = entry
+    return previous
+
+
+def compare(result, previous, threshold):
+    """Return a regression message when ads/sec dropped by more than threshold (a fraction), else None."""
+    if not previous or not previous.get('ads_per_sec') or result.get('ads_per_sec') is None:
+        return None  # No baseline to compare against; 0 ads/sec on this run counts as a 100% drop below
+    change = result['ads_per_sec'] / previous['ads_per_sec'] - 1
+    if change < -threshold:
+        return (f"REGRESSION {result['scenario']}: {result['ads_per_sec']} ads/s vs "
+                f"{previous['ads_per_sec']} at {previous.get('commit')} ({change:+.0%})")
+    return None
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark the scrapers against a local stand-in for q84sale.com.")
+    parser.add_argument("--site-dir", help="Serve recorded pages from this directory instead of generated ones")
+    parser.add_argument("--categories", type=int, default=3, help="Generated categories (default: %(default)s)")
+    parser.add_argument("--pages", type=int, default=3, help="Generated listing pages per category (default: %(default)s)")
+    parser.add_argument("--ads-per-page", type=int, default=20, help="Generated ads per listing page (default: %(default)s)")
+    parser.add_argument("--page-kb", type=int, default=60, help="Padding per generated page in KB (default: %(default)s)")
+    parser.add_argument("--layout", help="JSON file mapping category -> [[path template, pages]] for --site-dir")
+    parser.add_argument("--fetch-mode", action="append", choices=["json", "http", "browser"], help="Fetch modes to run (default: http)")
+    parser.add_argument("--max-concurrent", type=int, default=8, help="Fetches in flight (default: %(default)s)")
+    parser.add_argument("--threshold", type=float, default=0.10, help="ads/sec drop reported as a regression (default: %(default)s)")
+    parser.add_argument("--fail-on-regression", action="store_true", help="Exit with status 1 when a regression is found")
+    parser.add_argument("--no-history", action="store_true", help="Do not append this run to the history file")
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    fetch_modes = args.fetch_mode or ["http"]
+    commit = _git_commit()
+
+    with tempfile.TemporaryDirectory(prefix="scraper-bench-") as work_dir:
+        os.chdir(work_dir)  # Keep scraper.log, Excel files and the seen index out of the repository
+        if args.site_dir:
+            site_dir = Path(args.site_dir).resolve()
+            with open(args.layout, encoding="utf-8") as f:
+                layout = {category: [tuple(url) for url in urls] for category, urls in json.load(f).items()}
+            fixture = f"recorded:{site_dir.name}"
+        else:
+            site_dir = Path(work_dir) / "site"
+            layout = generate_site(site_dir, args.categories, args.pages, args.ads_per_page, args.page_kb)
+            fixture = f"generated:{args.categories}x{args.pages}x{args.ads_per_page}@{args.page_kb}kb"
+
+        results = []
+        with LocalSiteServer(site_dir) as server:
+            for fetch_mode in fetch_modes:
+                results.append(run_scenario(
+                    f"details_scraping_{fetch_mode}",
+                    lambda: bench_details_scraping(server.base_url, layout, fetch_mode, args.max_concurrent),
+                ))
+                results.append(run_scenario(
+                    f"category_crawler_{fetch_mode}",
+                    lambda: bench_category_crawler(server.base_url, layout, fetch_mode, args.max_concurrent,
+                                                   Path(work_dir) / f"crawler-{fetch_mode}"),
+                ))
+
+    previous = _previous_results(HISTORY_FILE, fixture, commit)
+    lines = [f"Benchmark at {commit} ({fixture})"]
+    regressions = []
+    for result in results:
+        lines.append(json.dumps(result, ensure_ascii=False))
+        message = compare(result, previous.get(result['scenario']), args.threshold)
+        if message:
+            regressions.append(message)
+    lines.extend(regressions or ["No regressions against the previous commit"])
+    OUTPUT_FILE.write_text("\n".join(lines) + "\n", encoding="utf-8")
+    print("\n".join(lines))
+
+    if not args.no_history:
+        with open(HISTORY_FILE, "a", encoding="utf-8") as f:
+            for result in results:
+                f.write(json.dumps({'commit': commit, 'date': datetime.now().isoformat(timespec="seconds"),
+                                    'fixture': fixture, **result}, ensure_ascii=False) + "\n")
+
+    return 1 if regressions and args.fail_on_regression else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,107 @@
+import argparse
+import asyncio
+import json
+import sys
+from contextlib import asynccontextmanager
+from pathlib import Path
+
+REPO_DIR = Path(__file__).resolve().parent
+sys.path.insert(0, str(REPO_DIR))
+
+from DetailsScraper import DETAIL_FIELDS, DetailsScraping
+from HttpFetcher import HttpFetcher
+from LocalSiteServer import LocalSiteServer
+from NextDataFetcher import NextDataFetcher
+
+FIXTURES_DIR = REPO_DIR / "fixtures"  # site/ holds the saved pages, expected.json what they must parse to
+VOLATILE_FIELDS = ('relative_date', 'fetched_at')  # Depend on when the check runs, only required to be set
+
+
+# Stands in for BrowserPool: the fixtures must parse without Playwright, so every page asked for is counted
+class NoBrowserPool:
+    def __init__(self):
+        self.page_requests = 0
+
+    @asynccontextmanager
+    async def page(self):
+        self.page_requests += 1
+        raise RuntimeError("the fixture check runs without Playwright")
+        yield
+
+
+def _differences(label, expected, actual):
+    return [
+        f"{label}: {key} expected {json.dumps(value, ensure_ascii=False)}, got {json.dumps(actual.get(key), ensure_ascii=False)}"
+        for key, value in expected.items() if actual.get(key) != value
+    ]
+
+
+async def check_fetch_mode(base_url, expected, fetch_mode):
+    """Parse every fixture page with one fetch mode; returns the differences from expected.json."""
+    problems = []
+    browser_pool = NoBrowserPool()
+    async with HttpFetcher() as fetcher:
+        next_data_fetcher = NextDataFetcher(fetcher)
+        for path, page in expected['listing_pages'].items():
+            scraper = DetailsScraping(base_url + path, browser_pool=browser_pool, fetch_mode=fetch_mode, http_fetcher=fetcher,
+                                      next_data_fetcher=next_data_fetcher, target_date=expected['target_date'])
+            cards = await scraper.get_basic_cards()
+            problems += _differences(f"{fetch_mode} {path}", page, {
+                'page_count': scraper.page_count,
+                'skipped_cards': scraper.skipped_cards,
+                'dated_in_window': scraper.dated_in_window,
+                'reached_older_ads': scraper.reached_older_ads,
+                'cards': [{**card, 'link': card['link'].removeprefix(base_url)} for card in cards],
+            })
+
+        for path, details in expected['detail_pages'].items():
+            scraper = DetailsScraping(base_url + path, browser_pool=browser_pool, fetch_mode=fetch_mode, http_fetcher=fetcher,
+                                      next_data_fetcher=next_data_fetcher)
+            if fetch_mode == "json":
+                actual = await scraper.scrape_details_over_json(base_url + path)
+            else:
+                actual = await scraper.scrape_details_over_http(base_url + path)
+            if details is None or actual is None:
+                # null in expected.json: the page lacks a required field and must fall back to Playwright
+                if actual != details:
+                    problems.append(f"{fetch_mode} {path}: expected {'a fallback' if details is None else 'details'}, got {actual}")
+                continue
+            if set(actual) != set(DETAIL_FIELDS + ('fetched_at',)):
+                problems.append(f"{fetch_mode} {path}: fields {sorted(actual)}")
+            problems += [f"{fetch_mode} {path}: {field} not set" for field in VOLATILE_FIELDS if not actual.get(field)]
+            problems += _differences(f"{fetch_mode} {path}", details, actual)
+
+    if fetch_mode == "json" and not next_data_fetcher.data_route_fetches:
+        problems.append("json: no page was read from its data route")
+    if browser_pool.page_requests:
+        problems.append(f"{fetch_mode}: {browser_pool.page_requests} Playwright page(s) requested")
+    return problems
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Check the listing and detail parsers against saved pages, offline.")
+    parser.add_argument("--fixtures-dir", default=str(FIXTURES_DIR), help="Folder with site/ and expected.json (default: %(default)s)")
+    parser.add_argument("--fetch-mode", action="append", choices=["json", "http"], help="Fetch modes to check (default: both)")
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    fixtures_dir = Path(args.fixtures_dir)
+    with open(fixtures_dir / "expected.json", encoding="utf-8") as f:
+        expected = json.load(f)
+
+    problems = []
+    with LocalSiteServer(fixtures_dir / "site") as server:
+        for fetch_mode in args.fetch_mode or ["json", "http"]:
+            mode_problems = asyncio.run(check_fetch_mode(server.base_url, expected, fetch_mode))
+            print(f"{fetch_mode}: {'OK' if not mode_problems else f'{len(mode_problems)} difference(s)'}")
+            problems += mode_problems
+
+    for problem in problems:
+        print(problem)
+    return 1 if problems else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())